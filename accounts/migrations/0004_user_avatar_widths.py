@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_user_avatar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='avatar_widths',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
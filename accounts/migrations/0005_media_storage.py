@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:31
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_avatar_widths'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='avatar',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.MediaStorage(), upload_to='users/avatars'),
+        ),
+    ]
@@ -1,12 +1,13 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
-from storages.backends.s3boto3 import S3Boto3Storage
+from core.storage import media_storage
 
 class User(AbstractUser):
     email = models.EmailField(unique=True)
     username = models.CharField(max_length=100, unique=True)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
-    avatar = models.ImageField(upload_to='users/avatars', storage=S3Boto3Storage(), blank=True, null=True)
+    avatar = models.ImageField(upload_to='users/avatars', storage=media_storage, blank=True, null=True)
+    avatar_widths = models.JSONField(default=list, blank=True, editable=False)
     bio = models.TextField(blank=True, null=True)
     date_of_birth = models.DateField(blank=True, null=True)
     country = models.CharField(max_length=100, blank=True, null=True)
@@ -1,7 +1,10 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from allauth.socialaccount.models import SocialAccount
-from .models import User
+from core.middleware import remember_language
+from .models import User, Profile
 
 @receiver(pre_save, sender=SocialAccount)
 def save_google_profile_info(sender, instance, **kwargs):
@@ -26,3 +29,16 @@ def save_google_profile_info(sender, instance, **kwargs):
             user.last_name = extra_data['family_name']
         
         user.save()
+
+
+@receiver(user_logged_in)
+def remember_preferred_language(sender, request, user, **kwargs):
+    """
+    Put the profile language in the language cookie at login, unless this
+    browser already chose one, so requests never look it up
+    """
+    if request is None or settings.LANGUAGE_COOKIE_NAME in request.COOKIES:
+        return
+    language = Profile.objects.filter(user=user).values_list('preferred_language', flat=True).first()
+    if language:
+        remember_language(request, language)
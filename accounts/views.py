@@ -4,6 +4,7 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.conf import settings
+from core.middleware import remember_language
 from .models import User, Profile
 from .forms import UserUpdateForm, ProfileUpdateForm
 
@@ -50,6 +51,7 @@ def profile_edit_view(request, username):
         if user_form.is_valid() and profile_form.is_valid():
             user_form.save()
             profile_form.save()
+            remember_language(request, profile.preferred_language)
             messages.success(request, 'Your profile has been updated successfully!')
             return redirect('profile', username=user.username)
         else:
@@ -87,7 +89,7 @@ def set_language_and_save(request):
             profile.preferred_language = lang_code
             profile.save()
         translation.activate(lang_code)
-        request.session['django_language'] = lang_code
+        remember_language(request, lang_code)
 
         import re
         if lang_code == 'ar':
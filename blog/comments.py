@@ -0,0 +1,25 @@
+from .models import ArticleComment
+
+
+def load_article_comments(article):
+    """
+    Return ``(comments, count)`` for an article page.
+
+    All approved comments are read in one query and grouped in memory:
+    ``comments`` holds the top-level ones, each with its approved direct
+    replies in ``approved_replies``, and ``count`` is the number of
+    approved comments at any depth.
+    """
+    approved = list(
+        ArticleComment.objects.filter(article=article, is_approved=True).select_related('author')
+    )
+    by_id = {comment.id: comment for comment in approved}
+    roots = []
+    for comment in approved:
+        comment.approved_replies = []
+    for comment in approved:
+        if comment.parent_id is None:
+            roots.append(comment)
+        elif comment.parent_id in by_id:
+            by_id[comment.parent_id].approved_replies.append(comment)
+    return roots, len(approved)
@@ -0,0 +1,83 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCountBuffer:
+    """
+    Write-behind buffer for article view counts.
+
+    Views are counted in memory and written in bulk with atomic
+    ``F('views_count') + n`` updates, one UPDATE per distinct increment,
+    once ``flush_interval`` seconds have passed or ``max_pending``
+    articles are waiting.
+    """
+
+    def __init__(self, flush_interval, max_pending):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def add(self, article_id, count=1):
+        with self._lock:
+            self._pending[article_id] += count
+            due = (
+                len(self._pending) >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def pending(self, article_id):
+        with self._lock:
+            return self._pending.get(article_id, 0)
+
+    def flush(self):
+        """Write buffered counts to the database, return the number of articles updated"""
+        from .models import Article
+
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        by_increment = defaultdict(list)
+        for article_id, count in pending.items():
+            by_increment[count].append(article_id)
+
+        try:
+            # All or nothing, so a failure never re-buffers counts already written
+            with transaction.atomic():
+                for count, article_ids in by_increment.items():
+                    Article.objects.filter(id__in=article_ids).update(views_count=F('views_count') + count)
+        except DatabaseError:
+            logger.exception("Failed to flush article view counts, keeping them buffered")
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+        return len(pending)
+
+
+view_counts = ViewCountBuffer(
+    flush_interval=settings.ARTICLE_VIEWS_FLUSH_INTERVAL,
+    max_pending=settings.ARTICLE_VIEWS_MAX_PENDING,
+)
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        view_counts.flush()
+    except Exception:
+        logger.exception("Failed to flush article view counts on exit")
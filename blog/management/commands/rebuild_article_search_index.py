@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Article
+from blog.search import article_index, index_article
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for all articles'
+
+    def handle(self, *args, **options):
+        if not article_index.is_supported:
+            self.stdout.write(self.style.WARNING('Full-text search is not supported on this database, skipping.'))
+            return
+
+        count = 0
+        with transaction.atomic():
+            article_index.clear()
+            for article in Article.objects.only('id', 'title', 'excerpt', 'content').iterator(chunk_size=500):
+                index_article(article)
+                count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} articles.'))
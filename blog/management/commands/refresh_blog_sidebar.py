@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.sidebar import refresh_sidebar
+
+
+class Command(BaseCommand):
+    help = 'Recompute the cached blog sidebar (categories, popular tags, featured articles)'
+
+    def handle(self, *args, **options):
+        refresh_sidebar()
+        self.stdout.write(self.style.SUCCESS('Blog sidebar refreshed.'))
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE blog_article_search ("
+            " object_id bigint NOT NULL REFERENCES blog_article (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,"
+            " language varchar(10) NOT NULL,"
+            " document tsvector NOT NULL,"
+            " PRIMARY KEY (object_id, language))"
+        )
+        schema_editor.execute(
+            "CREATE INDEX blog_article_search_document_gin "
+            "ON blog_article_search USING GIN (document)"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE blog_article_search USING fts5("
+            " object_id UNINDEXED, language UNINDEXED,"
+            " title, excerpt, content,"
+            " tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute("DROP TABLE IF EXISTS blog_article_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_alter_article_featured_image'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
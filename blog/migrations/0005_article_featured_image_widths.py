@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_article_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='featured_image_widths',
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+    ]
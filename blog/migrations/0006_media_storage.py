@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:31
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_article_featured_image_widths'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='article',
+            name='featured_image',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.MediaStorage(), upload_to='articles/images/'),
+        ),
+    ]
@@ -2,13 +2,16 @@ from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse
 from django.utils import timezone
-from django.utils.text import slugify
 from accounts.models import User
-from storages.backends.s3boto3 import S3Boto3Storage
+from core.slugs import SlugQuerySet, UniqueSlugMixin
+from core.storage import media_storage
+from .counters import view_counts
 
 
-class Category(models.Model):
+class Category(UniqueSlugMixin, models.Model):
     """Categories for articles"""
+    slug_fallback = 'category'
+    
     name = models.CharField(max_length=50)
     slug = models.SlugField(unique=True)
     description = models.TextField(blank=True, null=True)
@@ -16,6 +19,8 @@ class Category(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     
+    objects = SlugQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Category')
         verbose_name_plural = _('Categories')
@@ -23,30 +28,19 @@ class Category(models.Model):
     
     def __str__(self):
         return self.name
-    
-    def save(self, *args, **kwargs):
-        if not self.slug and self.name:
-            base_slug = slugify(self.name)
-            if not base_slug:  # If slugify returns empty (e.g., for Arabic text)
-                base_slug = f"category-{timezone.now().strftime('%Y%m%d%H%M%S')}"
-            
-            # Ensure unique slug
-            slug = base_slug
-            counter = 1
-            while Category.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
 
 
-class Tag(models.Model):
+class Tag(UniqueSlugMixin, models.Model):
     """Tags for articles"""
+    slug_fallback = 'tag'
+    
     name = models.CharField(max_length=50)
     slug = models.SlugField(unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = SlugQuerySet.as_manager()
+    
     class Meta:
         verbose_name = _('Tag')
         verbose_name_plural = _('Tags')
@@ -54,24 +48,9 @@ class Tag(models.Model):
     
     def __str__(self):
         return self.name
-    
-    def save(self, *args, **kwargs):
-        if not self.slug and self.name:
-            base_slug = slugify(self.name)
-            if not base_slug:  # If slugify returns empty (e.g., for Arabic text)
-                base_slug = f"category-{timezone.now().strftime('%Y%m%d%H%M%S')}"
-            
-            # Ensure unique slug
-            slug = base_slug
-            counter = 1
-            while Category.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
 
 
-class ArticleManager(models.Manager):
+class ArticleManager(models.Manager.from_queryset(SlugQuerySet)):
     """Custom manager for Article model"""
     
     def published(self):
@@ -81,8 +60,11 @@ class ArticleManager(models.Manager):
         return self.published().filter(is_featured=True)
 
 
-class Article(models.Model):
+class Article(UniqueSlugMixin, models.Model):
     """Articles for blog"""
+    slug_source_field = 'title'
+    slug_fallback = 'article'
+    
     STATUS_CHOICES = [
         ('draft', _('Draft')),
         ('published', _('Published')),
@@ -98,7 +80,8 @@ class Article(models.Model):
     
     excerpt = models.CharField(max_length=300, help_text=_('Brief description of the article'))
     content = models.TextField()
-    featured_image = models.ImageField(upload_to='articles/images/', storage=S3Boto3Storage(), blank=True, null=True)
+    featured_image = models.ImageField(upload_to='articles/images/', storage=media_storage, blank=True, null=True)
+    featured_image_widths = models.JSONField(default=list, blank=True, editable=False)
     
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     is_featured = models.BooleanField(default=False)
@@ -119,19 +102,6 @@ class Article(models.Model):
         return self.title
     
     def save(self, *args, **kwargs):
-        if not self.slug and self.title:
-            base_slug = slugify(self.title)
-            if not base_slug:  # If slugify returns empty (e.g., for Arabic text)
-                base_slug = f"article-{timezone.now().strftime('%Y%m%d%H%M%S')}"
-            
-            # Ensure unique slug
-            slug = base_slug
-            counter = 1
-            while Article.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base_slug}-{counter}"
-                counter += 1
-            self.slug = slug
-        
         # Set published_at when status changes to published
         if self.status == 'published' and not self.published_at:
             self.published_at = timezone.now()
@@ -148,9 +118,8 @@ class Article(models.Model):
         return self.status == 'published' and self.published_at and self.published_at <= timezone.now()
     
     def increment_views(self):
-        """Increment article views count"""
-        self.views_count += 1
-        self.save(update_fields=['views_count'])
+        """Count a view, written to the database in batches by the view buffer"""
+        view_counts.add(self.pk)
 
 
 class ArticleComment(models.Model):
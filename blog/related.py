@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Article
+
+RELATED_ARTICLES = 4
+
+
+def related_articles_key(category_id):
+    return f'blog:related:{category_id or "none"}'
+
+
+def refresh_related_articles(category_id):
+    """
+    Recompute and cache the newest published articles of a category.
+
+    One more article than is shown is kept, so any article of the category
+    can leave itself out and still fill the list.
+    """
+    articles = list(
+        Article.objects.published().filter(category_id=category_id).only(
+            'id', 'title', 'slug', 'featured_image', 'featured_image_widths', 'published_at', 'category_id'
+        )[:RELATED_ARTICLES + 1]
+    )
+    cache.set(related_articles_key(category_id), articles, settings.RELATED_ARTICLES_CACHE_TIMEOUT)
+    return articles
+
+
+def get_related_articles(article):
+    """
+    Other published articles of the article's category, newest first.
+
+    Served from a list cached per category, so article pages don't query
+    for them; the list is recomputed when it expires or when an article of
+    the category changes.
+    """
+    articles = cache.get(related_articles_key(article.category_id))
+    if articles is None:
+        articles = refresh_related_articles(article.category_id)
+    return [related for related in articles if related.id != article.id][:RELATED_ARTICLES]
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.utils import translation
+
+from core.search import SearchIndex
+
+
+article_index = SearchIndex(
+    table='blog_article_search',
+    model_table='blog_article',
+    fields=('title', 'excerpt', 'content'),
+    fallback_lookups=('title', 'excerpt', 'content'),
+)
+
+
+def index_article(article):
+    """Refresh the search index rows of an article for every site language"""
+    if not article_index.is_supported:
+        return
+    # Articles aren't translated; each language analyzes the same text
+    for language, _name in settings.LANGUAGES:
+        article_index.update(article.id, language, {
+            'title': article.title,
+            'excerpt': article.excerpt,
+            'content': article.content,
+        })
+
+
+def unindex_article(article_id):
+    article_index.delete(article_id)
+
+
+def search_articles(queryset, query, language=None):
+    """
+    Filter an Article queryset by ``query``, annotating ``search_rank`` and
+    a highlighted ``search_snippet`` of the content
+    """
+    language = (language or translation.get_language() or settings.LANGUAGE_CODE)[:2]
+    return article_index.search(queryset, query, language, snippet_field='content')
@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import translation
+
+from .models import Article, Category, Tag
+
+FEATURED_ARTICLES = 3
+POPULAR_TAGS = 10
+
+
+def sidebar_key(language):
+    return f'blog:sidebar:{language}'
+
+
+def invalidate_sidebar():
+    cache.delete_many([sidebar_key(code) for code, _name in settings.LANGUAGES])
+
+
+def build_sidebar():
+    """
+    Compute the blog sidebar in the active language.
+
+    Tags are ranked by how many published articles use them and featured
+    articles by their view count.
+    """
+    return {
+        'categories': list(Category.objects.filter(is_active=True)),
+        'popular_tags': list(
+            Tag.objects.annotate(
+                usage_count=Count('article', filter=Q(article__status='published'))
+            ).filter(usage_count__gt=0).order_by('-usage_count', 'name')[:POPULAR_TAGS]
+        ),
+        'featured_articles': list(
+            Article.objects.featured().select_related('author').order_by(
+                '-views_count', '-published_at'
+            )[:FEATURED_ARTICLES]
+        ),
+    }
+
+
+def refresh_sidebar():
+    """Recompute and cache the sidebar in every site language"""
+    for language, _name in settings.LANGUAGES:
+        with translation.override(language):
+            cache.set(sidebar_key(language), build_sidebar(), settings.BLOG_SIDEBAR_CACHE_TIMEOUT)
+
+
+def get_sidebar():
+    """
+    Return the cached sidebar of the active language.
+
+    ``refresh_blog_sidebar`` keeps it warm on a schedule; a cold cache is
+    filled by the first request that needs it.
+    """
+    key = sidebar_key(translation.get_language() or settings.LANGUAGE_CODE)
+    sidebar = cache.get(key)
+    if sidebar is None:
+        sidebar = build_sidebar()
+        cache.set(key, sidebar, settings.BLOG_SIDEBAR_CACHE_TIMEOUT)
+    return sidebar
@@ -0,0 +1,56 @@
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from .models import Article, Category, Tag
+from .related import refresh_related_articles
+from .search import index_article, unindex_article
+from .sidebar import invalidate_sidebar
+
+
+@receiver(post_save, sender=Article)
+def update_article_search_index(sender, instance, raw=False, **kwargs):
+    """Reindex the saved article; bulk view count updates don't send this"""
+    if raw:
+        return
+    index_article(instance)
+
+
+@receiver(post_delete, sender=Article)
+def remove_article_search_index(sender, instance, **kwargs):
+    unindex_article(instance.id)
+
+
+@receiver(pre_save, sender=Article)
+def remember_previous_category(sender, instance, raw=False, **kwargs):
+    """Keep the stored category to refresh its related articles on change"""
+    instance._previous_category = None
+    if instance.pk and not raw:
+        instance._previous_category = Article.objects.filter(pk=instance.pk).values('category_id').first()
+
+
+@receiver(post_save, sender=Article)
+def update_related_articles(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_related_articles(instance.category_id)
+    previous = instance._previous_category
+    if previous and previous['category_id'] != instance.category_id:
+        refresh_related_articles(previous['category_id'])
+
+
+@receiver(post_delete, sender=Article)
+def remove_related_article(sender, instance, **kwargs):
+    refresh_related_articles(instance.category_id)
+
+
+@receiver([post_save, post_delete], sender=Article)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Tag)
+def clear_sidebar(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_sidebar()
+
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def clear_sidebar_on_tags_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_sidebar()
@@ -10,6 +10,10 @@ from django.utils.translation import gettext_lazy as _
 
 from .models import Article, Category, Tag , ArticleComment  
 from .forms import ArticleForm, CommentForm, GuestCommentForm, ArticleSearchForm
+from .comments import load_article_comments
+from .related import get_related_articles
+from .search import search_articles as search_article_index
+from .sidebar import get_sidebar
 
 
 class CanPublishMixin(UserPassesTestMixin):
@@ -31,16 +35,12 @@ class ArticleListView(ListView):
     paginate_by = 12
     
     def get_queryset(self):
-        queryset = Article.objects.published()
+        queryset = Article.objects.published().select_related('author', 'category')
         
         # Search
         query = self.request.GET.get('query')
         if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(excerpt__icontains=query)
-            )
+            queryset = search_article_index(queryset, query).order_by('-search_rank', '-published_at')
         
         # Filter by category
         category_id = self.request.GET.get('category')
@@ -57,9 +57,7 @@ class ArticleListView(ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['search_form'] = ArticleSearchForm(self.request.GET)
-        context['featured_articles'] = Article.objects.featured()[:3]
-        context['categories'] = Category.objects.filter(is_active=True)
-        context['popular_tags'] = Tag.objects.all()[:10]
+        context.update(get_sidebar())
         return context
 
 
@@ -71,10 +69,12 @@ class ArticleDetailView(DetailView):
     def get_queryset(self):
         # Allow authors to view their own unpublished articles
         if self.request.user.is_authenticated:
-            return Article.objects.filter(
+            queryset = Article.objects.filter(
                 Q(status='published') | Q(author=self.request.user)
             )
-        return Article.objects.published()
+        else:
+            queryset = Article.objects.published()
+        return queryset.select_related('author', 'category').prefetch_related('tags')
     
     def get_object(self):
         article = super().get_object()
@@ -84,12 +84,10 @@ class ArticleDetailView(DetailView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        article = self.get_object()
+        article = self.object
         
         # Comments
-        comments = article.comments.filter(is_approved=True, parent=None)
-        context['comments'] = comments
-        context['comments_count'] = article.comments.filter(is_approved=True).count()
+        context['comments'], context['comments_count'] = load_article_comments(article)
         
         # Comment forms
         if self.request.user.is_authenticated:
@@ -98,9 +96,7 @@ class ArticleDetailView(DetailView):
             context['comment_form'] = GuestCommentForm()
         
         # Related articles
-        context['related_articles'] = Article.objects.published().filter(
-            category=article.category
-        ).exclude(id=article.id)[:4]
+        context['related_articles'] = get_related_articles(article)
         
         return context
 
@@ -280,11 +276,7 @@ def search_articles(request):
         tag = form.cleaned_data.get('tag')
         
         if query:
-            articles = articles.filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(excerpt__icontains=query)
-            )
+            articles = search_article_index(articles, query).order_by('-search_rank', '-published_at')
         
         if category:
             articles = articles.filter(category=category)
@@ -1,9 +1,12 @@
 from django.contrib import admin
 from modeltranslation.admin import TranslationAdmin
-from .models import SiteSettings
+from .models import SiteSettings, ImageVariantJob
 from . import translation
 
 
 @admin.register(SiteSettings)
 class SiteSettingsAdmin(TranslationAdmin):
     list_display = ('site_name', 'logo', 'favicon', 'contact_email', 'contact_phone', 'address', 'facebook', 'twitter', 'instagram', 'youtube')
+
+
+admin.site.register(ImageVariantJob)
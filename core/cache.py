@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from .models import SiteSettings
+
+
+HOME_FRAGMENT = 'home_content'
+
+SITE_SETTINGS_KEY = 'core:site_settings'
+
+# Sentinel telling "not cached" apart from a cached ``None`` (no settings row)
+_MISSING = object()
+
+# In-process copy of the site settings as (expires_at, value)
+_local_site_settings = (0, _MISSING)
+
+
+def home_fragment_key(language):
+    return make_template_fragment_key(HOME_FRAGMENT, [language])
+
+
+def invalidate_home_page():
+    """Drop the cached home page content in every language"""
+    cache.delete_many([home_fragment_key(code) for code, _name in settings.LANGUAGES])
+
+
+def get_site_settings():
+    """
+    Return the ``SiteSettings`` singleton (or None).
+
+    Reads go through a short-lived per-process copy first, then the shared
+    cache, and only hit the database when both are empty.
+    """
+    global _local_site_settings
+
+    now = time.monotonic()
+    expires_at, value = _local_site_settings
+    if expires_at > now and value is not _MISSING:
+        return value
+
+    value = cache.get(SITE_SETTINGS_KEY, _MISSING)
+    if value is _MISSING:
+        value = SiteSettings.objects.first()
+        cache.set(SITE_SETTINGS_KEY, value, settings.SITE_SETTINGS_CACHE_TIMEOUT)
+
+    _local_site_settings = (now + settings.SITE_SETTINGS_LOCAL_TTL, value)
+    return value
+
+
+def invalidate_site_settings():
+    global _local_site_settings
+    _local_site_settings = (0, _MISSING)
+    cache.delete(SITE_SETTINGS_KEY)
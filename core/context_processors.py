@@ -1,6 +1,8 @@
-from .models import SiteSettings
+from django.utils.functional import SimpleLazyObject
+from .cache import get_site_settings
 
 def site_settings(request):
+    # Resolved only when a template actually reads it
     return {
-        'site_settings': SiteSettings.objects.first()
+        'site_settings': SimpleLazyObject(get_site_settings)
     }
@@ -0,0 +1,177 @@
+import logging
+import mimetypes
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import ImageVariantJob
+
+logger = logging.getLogger(__name__)
+
+# Storages set the Content-Type of uploads from the file name
+mimetypes.add_type('image/webp', '.webp')
+
+# Widths of the WebP variants written next to each original; widths at or
+# above the original's are skipped
+VARIANT_WIDTHS = (160, 320, 640, 1280)
+VARIANT_QUALITY = 80
+
+# Image fields that get variants, by model label. The widths written,
+# followed by the original's own width, are stored in a ``<field>_widths``
+# JSON field of the same model.
+RESPONSIVE_IMAGE_FIELDS = {
+    'courses.Course': 'thumbnail',
+    'blog.Article': 'featured_image',
+    'accounts.User': 'avatar',
+    'core.SiteSettings': 'logo',
+}
+
+
+def widths_field(field_name):
+    return f'{field_name}_widths'
+
+
+def variant_name(name, width):
+    """Storage name of the ``width`` variant of the original ``name``"""
+    root, _ext = os.path.splitext(name)
+    return f'{root}.w{width}.webp'
+
+
+def image_srcset(image):
+    """
+    ``srcset`` value for an image field file, empty until its variants
+    exist. The original is the widest candidate: browsers ignore ``src``
+    once ``srcset`` has width descriptors.
+    """
+    if not image:
+        return ''
+    widths = getattr(image.instance, widths_field(image.field.name), None)
+    if not widths:
+        return ''
+    *variant_widths, original_width = widths
+    candidates = [f'{image.storage.url(variant_name(image.name, width))} {width}w' for width in variant_widths]
+    candidates.append(f'{image.url} {original_width}w')
+    return ', '.join(candidates)
+
+
+def render_variants(image, widths=VARIANT_WIDTHS):
+    """
+    Write resized WebP copies of an image field file next to the original,
+    in the same storage. Returns the widths written followed by the
+    original's width.
+    """
+    storage = image.storage
+    with storage.open(image.name, 'rb') as f:
+        original = ImageOps.exif_transpose(Image.open(f))
+        original.load()
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if original.mode in ('LA', 'P', 'PA') else 'RGB')
+
+    written = []
+    for width in sorted(widths):
+        if width >= original.width:
+            break
+        height = max(1, round(original.height * width / original.width))
+        buffer = BytesIO()
+        original.resize((width, height), Image.Resampling.LANCZOS).save(buffer, 'WEBP', quality=VARIANT_QUALITY)
+        name = variant_name(image.name, width)
+        # Keep the predictable name instead of letting the storage pick a free one
+        storage.delete(name)
+        storage.save(name, ContentFile(buffer.getvalue()))
+        written.append(width)
+    return written + [original.width]
+
+
+def queue_variants(instance, field_name):
+    ImageVariantJob.objects.create(
+        model=instance._meta.label,
+        object_id=instance.pk,
+        field=field_name,
+        name=getattr(instance, field_name).name,
+    )
+
+
+def queue_missing_variants():
+    """Queue a job for every stored image without variants or a pending job. Returns the number queued"""
+    pending = set(ImageVariantJob.objects.filter(status='pending').values_list('model', 'object_id'))
+    jobs = []
+    for label, field_name in RESPONSIVE_IMAGE_FIELDS.items():
+        model = apps.get_model(label)
+        images = model._default_manager.exclude(**{f'{field_name}__isnull': True}).exclude(
+            **{field_name: ''}
+        ).filter(**{widths_field(field_name): []}).values_list('pk', field_name)
+        jobs.extend(
+            ImageVariantJob(model=label, object_id=pk, field=field_name, name=name)
+            for pk, name in images.iterator()
+            if (label, pk) not in pending
+        )
+    ImageVariantJob.objects.bulk_create(jobs, batch_size=500)
+    return len(jobs)
+
+
+def process_job(job):
+    """
+    Render the variants of a job's image and record their widths on the
+    object. Jobs whose object is gone or has had its image replaced since
+    are just marked processed.
+
+    The object's row is only locked for the final check and save, not
+    while the image is downloaded, resized and uploaded.
+    """
+    model = apps.get_model(job.model)
+    current = model._default_manager.filter(pk=job.object_id, **{job.field: job.name})
+    instance = current.only('pk', job.field).first()
+    if instance is None:
+        return
+    widths = render_variants(getattr(instance, job.field))
+
+    with transaction.atomic():
+        instance = current.select_for_update().first()
+        if instance is None:
+            return
+        setattr(instance, widths_field(job.field), widths)
+        instance.save(update_fields=[widths_field(job.field)])
+
+
+def process_pending_jobs(limit=20):
+    """
+    Run up to ``limit`` pending image variant jobs, oldest first.
+
+    Jobs are claimed with ``select_for_update(skip_locked=True)`` so
+    concurrent workers never render the same image; a failing job is
+    marked failed and left for inspection.
+
+    Returns ``(processed, failed)``.
+    """
+    job_ids = list(
+        ImageVariantJob.objects.filter(status='pending').order_by('created_at', 'id').values_list('id', flat=True)[:limit]
+    )
+    processed = failed = 0
+    for job_id in job_ids:
+        try:
+            with transaction.atomic():
+                job = ImageVariantJob.objects.select_for_update(skip_locked=True).filter(
+                    pk=job_id, status='pending'
+                ).first()
+                if job is None:
+                    # Claimed by another worker
+                    continue
+                process_job(job)
+                job.status = 'processed'
+                job.processed_at = timezone.now()
+                job.save(update_fields=['status', 'processed_at'])
+            processed += 1
+        except Exception as e:
+            logger.exception(f"Image variant job {job_id} failed")
+            ImageVariantJob.objects.filter(pk=job_id, status='pending').update(
+                status='failed',
+                last_error=str(e),
+                processed_at=timezone.now(),
+            )
+            failed += 1
+    return processed, failed
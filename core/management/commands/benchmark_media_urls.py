@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from core.images import VARIANT_WIDTHS
+from core.storage import MediaStorage
+from courses.models import Course
+
+CARD_TEMPLATE = Template(
+    '{% load image_tags %}{% for course in courses %}'
+    '<img src="{{ course.thumbnail.url }}" srcset="{% srcset course.thumbnail %}">'
+    '{% endfor %}'
+)
+
+
+class Command(BaseCommand):
+    help = 'Compare the cost of media URLs on a catalog page with plain and memoized S3 storage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cards', type=int, default=100, help='Course cards on the page')
+        parser.add_argument('--rounds', type=int, default=50, help='Page renders to average over')
+
+    def handle(self, *args, **options):
+        cards, rounds = options['cards'], options['rounds']
+        # Each card shows the thumbnail and a srcset of its variants and the original
+        urls_per_page = cards * (2 + len(VARIANT_WIDTHS))
+        field = Course._meta.get_field('thumbnail')
+        original_storage = field.storage
+
+        results = {}
+        try:
+            for label, storage in (('S3Boto3Storage', S3Boto3Storage()), ('MediaStorage', MediaStorage())):
+                field.storage = storage
+                courses = [
+                    Course(thumbnail=f'courses/thumbnails/course-{i}.jpg', thumbnail_widths=[*VARIANT_WIDTHS, 1600])
+                    for i in range(cards)
+                ]
+                # The first render fills the URL cache, as the first request of a process does
+                CARD_TEMPLATE.render(Context({'courses': courses}))
+                started = time.perf_counter()
+                for _round in range(rounds):
+                    CARD_TEMPLATE.render(Context({'courses': courses}))
+                page = (time.perf_counter() - started) / rounds
+
+                started = time.perf_counter()
+                for _round in range(rounds):
+                    for course in courses:
+                        storage.url(course.thumbnail.name)
+                per_url = (time.perf_counter() - started) / (rounds * cards)
+                results[label] = (page, per_url)
+        finally:
+            field.storage = original_storage
+
+        self.stdout.write(f'{cards} cards, {urls_per_page} media URLs per page, {rounds} rounds')
+        for label, (page, per_url) in results.items():
+            self.stdout.write(f'{label:>15}: {page * 1000:8.2f} ms per page, {per_url * 1e6:8.2f} us per URL')
+        before, after = results['S3Boto3Storage'], results['MediaStorage']
+        self.stdout.write(self.style.SUCCESS(
+            f'URLs are {before[1] / after[1]:.1f}x faster, pages {before[0] / after[0]:.1f}x faster'
+        ))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.images import process_pending_jobs, queue_missing_variants
+
+
+class Command(BaseCommand):
+    help = 'Render resized WebP variants of newly uploaded images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20, help='Images to process per batch')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new images')
+        parser.add_argument('--interval', type=float, default=5, help='Seconds to wait when the queue is empty')
+        parser.add_argument('--backfill', action='store_true', help='First queue every stored image without variants')
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            self.stdout.write(f'Queued {queue_missing_variants()} images.')
+        while True:
+            processed, failed = process_pending_jobs(options['batch_size'])
+            if processed or failed:
+                self.stdout.write(f'Processed {processed} images, {failed} failed.')
+            if not options['loop']:
+                break
+            if processed + failed < options['batch_size']:
+                time.sleep(options['interval'])
@@ -1,19 +1,127 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.conf.urls.i18n import is_language_prefix_patterns_used
+from django.middleware.locale import LocaleMiddleware
+from django.urls import get_script_prefix, is_valid_path
 from django.utils import translation
+from django.utils.cache import patch_vary_headers
+
+
+def remember_language(request, language):
+    """Store ``language`` in the language cookie of the response to ``request``"""
+    request._remembered_language = language
+
+
+class LanguageMiddleware(LocaleMiddleware):
+    """
+    Resolve the request language without touching the session or database.
+
+    The URL prefix decides the language as in ``LocaleMiddleware``. A user's
+    profile language is written to the language cookie once, when they log
+    in or change it (see ``remember_language``), and safe requests to an
+    unprefixed URL are redirected to the prefixed one of the cookie
+    language, instead of the profile being looked up on every request.
+    The time spent resolving is reported in a ``Server-Timing`` header.
+    """
+
+    def process_request(self, request):
+        started = time.perf_counter()
+        super().process_request(request)
+        response = self.redirect_to_preferred_language(request)
+        request._language_resolution_ms = (time.perf_counter() - started) * 1000
+        return response
+
+    def redirect_to_preferred_language(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        urlconf = getattr(request, 'urlconf', settings.ROOT_URLCONF)
+        i18n_patterns_used, prefixed_default_language = is_language_prefix_patterns_used(urlconf)
+        if not i18n_patterns_used or prefixed_default_language:
+            return None
+        if translation.get_language_from_path(request.path_info):
+            return None
+        try:
+            language = translation.get_supported_language_variant(request.COOKIES.get(settings.LANGUAGE_COOKIE_NAME))
+        except LookupError:
+            return None
+        if language == settings.LANGUAGE_CODE:
+            return None
+        with translation.override(language):
+            if not is_valid_path(f'/{language}{request.path_info}', urlconf):
+                return None
+
+        script_prefix = get_script_prefix()
+        redirect = self.response_redirect_class(
+            request.get_full_path().replace(script_prefix, f'{script_prefix}{language}/', 1)
+        )
+        patch_vary_headers(redirect, ('Cookie',))
+        return redirect
+
+    def process_response(self, request, response):
+        response = super().process_response(request, response)
+        language = getattr(request, '_remembered_language', None)
+        if language:
+            response.set_cookie(
+                settings.LANGUAGE_COOKIE_NAME,
+                language,
+                max_age=settings.LANGUAGE_COOKIE_AGE,
+                path=settings.LANGUAGE_COOKIE_PATH,
+                domain=settings.LANGUAGE_COOKIE_DOMAIN,
+                secure=settings.LANGUAGE_COOKIE_SECURE,
+                httponly=settings.LANGUAGE_COOKIE_HTTPONLY,
+                samesite=settings.LANGUAGE_COOKIE_SAMESITE,
+            )
+        duration = getattr(request, '_language_resolution_ms', None)
+        if duration is not None:
+            timing = f'language;dur={duration:.3f}'
+            if response.has_header('Server-Timing'):
+                timing = f"{response['Server-Timing']}, {timing}"
+            response['Server-Timing'] = timing
+        return response
+
+
+class SlidingSessionMiddleware:
+    """
+    Keep active sessions alive without saving them on every request.
+
+    The time of the last save is kept in the session. An unchanged session
+    is only marked modified, and so written and its cookie re-sent, once
+    less than ``SESSION_REFRESH_WINDOW`` seconds of it remain. Requests that
+    never touch the session don't load it here either.
+    """
+    async_capable = True
+    sync_capable = True
+
+    refreshed_key = '_session_refreshed_at'
 
-class PreferredLanguageMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        lang_code = request.session.get('django_language')
-        user = request.user
-        if lang_code:
-            translation.activate(lang_code)
-            request.LANGUAGE_CODE = lang_code
-        elif user.is_authenticated:
-            profile = getattr(user, "profile", None)
-            if profile and profile.preferred_language:
-                translation.activate(profile.preferred_language)
-                request.LANGUAGE_CODE = profile.preferred_language
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
         response = self.get_response(request)
+        self.refresh_session(request)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        await sync_to_async(self.refresh_session)(request)
         return response
+
+    def refresh_session(self, request):
+        session = getattr(request, 'session', None)
+        if session is None or not session.accessed or session.is_empty():
+            return
+        now = int(time.time())
+        refreshed_at = session.get(self.refreshed_key)
+        if (
+            session.modified
+            or refreshed_at is None
+            or now - refreshed_at > settings.SESSION_COOKIE_AGE - settings.SESSION_REFRESH_WINDOW
+        ):
+            session[self.refreshed_key] = now
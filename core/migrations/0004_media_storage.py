@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:31
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_image_variants'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='favicon',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.MediaStorage(), upload_to='site/'),
+        ),
+        migrations.AlterField(
+            model_name='sitesettings',
+            name='logo',
+            field=models.ImageField(blank=True, null=True, storage=core.storage.MediaStorage(), upload_to='site/'),
+        ),
+    ]
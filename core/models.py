@@ -1,11 +1,12 @@
 from django.db import models
-from storages.backends.s3boto3 import S3Boto3Storage
+from .storage import media_storage
 
 
 class SiteSettings(models.Model):
     site_name = models.CharField(max_length=100, default='Learning Academy')
-    logo = models.ImageField(upload_to='site/', storage=S3Boto3Storage(), blank=True, null=True)
-    favicon = models.ImageField(upload_to='site/', storage=S3Boto3Storage(), blank=True, null=True)
+    logo = models.ImageField(upload_to='site/', storage=media_storage, blank=True, null=True)
+    logo_widths = models.JSONField(default=list, blank=True, editable=False)
+    favicon = models.ImageField(upload_to='site/', storage=media_storage, blank=True, null=True)
     contact_email = models.EmailField()
     contact_phone = models.CharField(max_length=20)
     address = models.CharField(max_length=255)
@@ -17,3 +18,33 @@ class SiteSettings(models.Model):
     class Meta:
         verbose_name = 'Site Settings'
         verbose_name_plural = 'Site Settings'
+
+
+class ImageVariantJob(models.Model):
+    """Queue of uploaded images waiting for their resized variants"""
+    STATUS = [
+        ('pending', 'Pending'),
+        ('processed', 'Processed'),
+        ('failed', 'Failed'),
+    ]
+    
+    model = models.CharField(max_length=100)  # Model label, e.g. 'courses.Course'
+    object_id = models.PositiveBigIntegerField()
+    field = models.CharField(max_length=100)
+    name = models.CharField(max_length=255)  # Storage name of the original
+    
+    status = models.CharField(max_length=20, choices=STATUS, default='pending')
+    last_error = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = 'Image Variant Job'
+        verbose_name_plural = 'Image Variant Jobs'
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='image_variant_queue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.model} {self.object_id} {self.field} ({self.status})"
@@ -0,0 +1,131 @@
+import base64
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """JSON encoder keeping full microsecond precision for datetimes"""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPage:
+    """A page of results produced by ``KeysetPaginator``"""
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+
+class KeysetPaginator:
+    """
+    Seek pagination over an ordered queryset.
+
+    Instead of ``OFFSET`` each page is located with a ``WHERE`` clause on the
+    sort key of the last (or first) row of the neighbouring page, so every page
+    costs the same as the first one. ``ordering`` must end with a unique
+    column (usually ``id``) to act as a stable tiebreaker.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+        self.model = queryset.model
+
+    def _fields(self):
+        return [(name.lstrip('-'), name.startswith('-')) for name in self.ordering]
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, field) for field, _desc in self._fields()]
+        payload = json.dumps(values, cls=CursorEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Return the decoded sort key values, or None for a malformed cursor"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            fields = self._fields()
+            if not isinstance(values, list) or len(values) != len(fields):
+                return None
+            return [
+                self.model._meta.get_field(field).to_python(value)
+                for (field, _desc), value in zip(fields, values)
+            ]
+        except (ValueError, TypeError, ValidationError):
+            return None
+
+    def _seek(self, values, reverse):
+        """Build the condition selecting rows strictly after ``values``"""
+        condition = Q()
+        equal = Q()
+        for (field, descending), value in zip(self._fields(), values):
+            forward_lookup = 'lt' if descending else 'gt'
+            if reverse:
+                forward_lookup = 'gt' if forward_lookup == 'lt' else 'lt'
+            condition |= equal & Q(**{f'{field}__{forward_lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def get_page(self, after=None, before=None):
+        """Return the page following ``after`` or preceding ``before``"""
+        values = None
+        reverse = False
+        if before:
+            values = self.decode_cursor(before)
+            reverse = values is not None
+        if values is None and after:
+            values = self.decode_cursor(after)
+
+        if reverse:
+            ordering = [name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering]
+        else:
+            ordering = self.ordering
+
+        queryset = self.queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        return KeysetPage(
+            rows,
+            has_next=has_next,
+            has_previous=has_previous,
+            next_cursor=self.encode_cursor(rows[-1]) if rows and has_next else None,
+            previous_cursor=self.encode_cursor(rows[0]) if rows and has_previous else None,
+        )
@@ -0,0 +1,216 @@
+import re
+from functools import reduce
+from operator import and_, or_
+
+from django.db import connection
+from django.db.models import CharField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import mark_safe
+
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Weight labels used by PostgreSQL ``setweight``; the same order is used for
+# the per-column bm25 weights on SQLite.
+WEIGHT_LABELS = ('A', 'B', 'C', 'D')
+BM25_WEIGHTS = (10.0, 5.0, 2.0, 1.0)
+
+# Control characters wrapping matched terms in snippets, swapped for <mark>
+# tags only after the snippet text has been escaped
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+SNIPPET_ELLIPSIS = '…'
+SNIPPET_WORDS = 24
+
+# Text search configuration per site language (PostgreSQL only)
+PG_CONFIGS = {
+    'en': 'english',
+    'ar': 'simple',
+}
+
+
+def query_tokens(query, limit=8):
+    """Split a raw search string into safe word tokens"""
+    return TOKEN_RE.findall(query or '')[:limit]
+
+
+class SearchIndex:
+    """
+    Full-text index kept in a shadow table next to a model.
+
+    One row is stored per object and language. On PostgreSQL the row holds a
+    weighted ``tsvector`` backed by a GIN index, on SQLite it is an FTS5
+    virtual table with one column per indexed field. Other backends fall back
+    to ``icontains`` lookups.
+    """
+
+    def __init__(self, table, model_table, fields, fallback_lookups):
+        self.table = table
+        self.model_table = model_table
+        self.fields = fields
+        self.fallback_lookups = fallback_lookups
+
+    @property
+    def vendor(self):
+        return connection.vendor
+
+    @property
+    def is_supported(self):
+        return self.vendor in ('postgresql', 'sqlite')
+
+    def pg_config(self, language):
+        return PG_CONFIGS.get(language, 'simple')
+
+    def update(self, object_id, language, values):
+        """Insert or replace the index row of one object in one language"""
+        texts = [values.get(field) or '' for field in self.fields]
+        with connection.cursor() as cursor:
+            if self.vendor == 'postgresql':
+                config = self.pg_config(language)
+                document = ' || '.join(
+                    f"setweight(to_tsvector(%s::regconfig, %s), '{WEIGHT_LABELS[i]}')"
+                    for i in range(len(self.fields))
+                )
+                params = [object_id, language]
+                for text in texts:
+                    params += [config, text]
+                cursor.execute(
+                    f"INSERT INTO {self.table} (object_id, language, document) "
+                    f"VALUES (%s, %s, {document}) "
+                    f"ON CONFLICT (object_id, language) DO UPDATE SET document = EXCLUDED.document",
+                    params,
+                )
+            elif self.vendor == 'sqlite':
+                cursor.execute(
+                    f"DELETE FROM {self.table} WHERE object_id = %s AND language = %s",
+                    [object_id, language],
+                )
+                columns = ', '.join(self.fields)
+                placeholders = ', '.join(['%s'] * len(self.fields))
+                cursor.execute(
+                    f"INSERT INTO {self.table} (object_id, language, {columns}) "
+                    f"VALUES (%s, %s, {placeholders})",
+                    [object_id, language] + texts,
+                )
+
+    def delete(self, object_id):
+        """Remove every index row of one object"""
+        if not self.is_supported:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table} WHERE object_id = %s", [object_id])
+
+    def clear(self):
+        if not self.is_supported:
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def match_sql(self, tokens, language):
+        """Return (where_sql, params) selecting index rows matching every token"""
+        if self.vendor == 'postgresql':
+            tsquery = ' & '.join(f'{token}:*' for token in tokens)
+            return (
+                f"{self.table}.language = %s AND "
+                f"{self.table}.document @@ to_tsquery(%s::regconfig, %s)",
+                [language, self.pg_config(language), tsquery],
+            )
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        return (
+            f"{self.table} MATCH %s AND {self.table}.language = %s",
+            [match, language],
+        )
+
+    def rank_sql(self, language, tokens):
+        """Return (select_sql, params) computing a relevance score, higher is better"""
+        if self.vendor == 'postgresql':
+            tsquery = ' & '.join(f'{token}:*' for token in tokens)
+            return (
+                f"ts_rank({self.table}.document, to_tsquery(%s::regconfig, %s))",
+                [self.pg_config(language), tsquery],
+            )
+        weights = ', '.join(str(w) for w in BM25_WEIGHTS[:len(self.fields)])
+        return f"-bm25({self.table}, 0, 0, {weights})", []
+
+    def snippet_sql(self, field, language, tokens):
+        """
+        Return (select_sql, params) for a short excerpt of ``field`` around
+        the matched terms, which are wrapped in the highlight markers.
+
+        SQLite reads the excerpt from the FTS5 table itself; PostgreSQL's
+        ``ts_headline`` works on the model column, so the text never has to
+        be loaded into Python.
+        """
+        if self.vendor == 'postgresql':
+            tsquery = ' & '.join(f'{token}:*' for token in tokens)
+            options = (
+                f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_END}", '
+                f'MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}, '
+                f'MaxFragments=2, FragmentDelimiter=" {SNIPPET_ELLIPSIS} "'
+            )
+            config = self.pg_config(language)
+            return (
+                f"ts_headline(%s::regconfig, {self.model_table}.{field}, to_tsquery(%s::regconfig, %s), %s)",
+                [config, config, tsquery, options],
+            )
+        # FTS5 columns are (object_id, language, *fields)
+        column = 2 + self.fields.index(field)
+        return (
+            f"snippet({self.table}, {column}, %s, %s, %s, {SNIPPET_WORDS})",
+            [HIGHLIGHT_START, HIGHLIGHT_END, SNIPPET_ELLIPSIS],
+        )
+
+    def search(self, queryset, query, language, snippet_field=None):
+        """
+        Filter ``queryset`` down to objects matching ``query`` and annotate
+        each with a ``search_rank`` (higher is more relevant).
+
+        With ``snippet_field``, each object also gets a ``search_snippet``
+        of that field with the matched terms marked; see ``highlight``.
+        """
+        tokens = query_tokens(query)
+        if not tokens:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+        if not self.is_supported:
+            condition = reduce(and_, (
+                reduce(or_, (Q(**{f'{lookup}__icontains': token}) for lookup in self.fallback_lookups))
+                for token in tokens
+            ))
+            queryset = queryset.filter(condition).annotate(
+                search_rank=Value(0.0, output_field=FloatField())
+            )
+            if snippet_field:
+                queryset = queryset.annotate(search_snippet=Value('', output_field=CharField()))
+            return queryset
+
+        where_sql, where_params = self.match_sql(tokens, language)
+        rank_sql, rank_params = self.rank_sql(language, tokens)
+        matched = RawSQL(
+            f"SELECT {self.table}.object_id FROM {self.table} WHERE {where_sql}",
+            where_params,
+        )
+        rank = RawSQL(
+            f"SELECT {rank_sql} FROM {self.table} WHERE {where_sql} "
+            f"AND {self.table}.object_id = {self.model_table}.id",
+            rank_params + where_params,
+            output_field=FloatField(),
+        )
+        queryset = queryset.filter(id__in=matched).annotate(search_rank=rank)
+        if snippet_field:
+            snippet_sql, snippet_params = self.snippet_sql(snippet_field, language, tokens)
+            snippet = RawSQL(
+                f"SELECT {snippet_sql} FROM {self.table} WHERE {where_sql} "
+                f"AND {self.table}.object_id = {self.model_table}.id",
+                snippet_params + where_params,
+                output_field=CharField(),
+            )
+            queryset = queryset.annotate(search_snippet=snippet)
+        return queryset
+
+
+def highlight(snippet):
+    """Render a search snippet as HTML with the matched terms in <mark> tags"""
+    text = escape(strip_tags(snippet or ''))
+    return mark_safe(text.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>'))
@@ -0,0 +1,48 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from courses.models import Course
+from .models import SiteSettings
+from .cache import invalidate_home_page, invalidate_site_settings
+from .images import RESPONSIVE_IMAGE_FIELDS, queue_variants, widths_field
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+def clear_home_page_cache(sender, **kwargs):
+    """The home page shows featured courses and site settings"""
+    invalidate_home_page()
+
+
+@receiver(post_save, sender=SiteSettings)
+@receiver(post_delete, sender=SiteSettings)
+def clear_site_settings_cache(sender, **kwargs):
+    invalidate_site_settings()
+
+
+def reset_image_variants(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Drop the variant widths of a replaced image and mark it for a new job"""
+    field_name = RESPONSIVE_IMAGE_FIELDS[sender._meta.label]
+    instance._queue_image_variants = False
+    if raw or (update_fields is not None and field_name not in update_fields):
+        return
+    name = getattr(instance, field_name).name or ''
+    previous = ''
+    if instance.pk:
+        previous = sender._default_manager.filter(pk=instance.pk).values_list(field_name, flat=True).first() or ''
+    if name != previous:
+        setattr(instance, widths_field(field_name), [])
+        instance._queue_image_variants = bool(name)
+
+
+def queue_image_variants(sender, instance, raw=False, **kwargs):
+    if raw or not getattr(instance, '_queue_image_variants', False):
+        return
+    instance._queue_image_variants = False
+    queue_variants(instance, RESPONSIVE_IMAGE_FIELDS[sender._meta.label])
+
+
+for label in RESPONSIVE_IMAGE_FIELDS:
+    pre_save.connect(reset_image_variants, sender=label, dispatch_uid=f'reset_image_variants:{label}')
+    post_save.connect(queue_image_variants, sender=label, dispatch_uid=f'queue_image_variants:{label}')
@@ -0,0 +1,153 @@
+import re
+from collections import defaultdict
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, IntegerField, Max, Q
+from django.db.models.functions import Cast, Substr
+from django.utils.text import slugify
+
+
+# Arabic letters spelled out in Latin so Arabic names get readable slugs
+# instead of the empty string ``slugify`` returns for them
+ARABIC_TRANSLITERATION = str.maketrans({
+    'ا': 'a', 'أ': 'a', 'إ': 'i', 'آ': 'aa', 'ٱ': 'a', 'ء': '', 'ئ': 'y', 'ؤ': 'w',
+    'ب': 'b', 'ت': 't', 'ث': 'th', 'ج': 'j', 'ح': 'h', 'خ': 'kh',
+    'د': 'd', 'ذ': 'dh', 'ر': 'r', 'ز': 'z', 'س': 's', 'ش': 'sh',
+    'ص': 's', 'ض': 'd', 'ط': 't', 'ظ': 'z', 'ع': 'a', 'غ': 'gh',
+    'ف': 'f', 'ق': 'q', 'ك': 'k', 'ل': 'l', 'م': 'm', 'ن': 'n',
+    'ه': 'h', 'ة': 'h', 'و': 'w', 'ي': 'y', 'ى': 'a',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
+    '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+    '،': ',', '؟': '?', 'ـ': '',
+})
+
+# Harakat (short vowel and shadda marks) carry no letters of their own
+ARABIC_DIACRITICS_RE = re.compile('[\u064b-\u0652\u0670]')
+
+# Room kept at the end of a truncated slug for a ``-<n>`` suffix
+SUFFIX_WIDTH = 7
+
+# Attempts at saving a new object before a slug race is given up on
+SAVE_ATTEMPTS = 3
+
+
+def transliterate(text):
+    return ARABIC_DIACRITICS_RE.sub('', text or '').translate(ARABIC_TRANSLITERATION)
+
+
+def base_slug(text, fallback, max_length=50):
+    """Slug for ``text`` (transliterated if needed), ``fallback`` if nothing is left of it"""
+    slug = slugify(transliterate(text))[:max_length].strip('-')
+    return slug or fallback
+
+
+def _stem(slug, max_length):
+    return slug[:max_length - SUFFIX_WIDTH].rstrip('-')
+
+
+def slug_usage(queryset, slug, max_length=50, exclude_pk=None):
+    """
+    Return whether ``slug`` itself is taken in ``queryset`` and the highest
+    numeric suffix taken on its stem (0 if none), in one query.
+    """
+    stem = _stem(slug, max_length)
+    # Up to nine digits, so the cast below fits a 32-bit integer; longer
+    # numeric tails are part of a title rather than a suffix we added
+    suffixed = Q(slug__regex=rf'^{re.escape(stem)}-[0-9]{{1,9}}$')
+    if exclude_pk is not None:
+        queryset = queryset.exclude(pk=exclude_pk)
+    taken = queryset.filter(Q(slug=slug) | suffixed).aggregate(
+        exact=Count('pk', filter=Q(slug=slug)),
+        top=Max(Cast(Substr('slug', len(stem) + 2), IntegerField()), filter=suffixed),
+    )
+    return bool(taken['exact']), taken['top'] or 0
+
+
+def unique_slug(queryset, slug, max_length=50, exclude_pk=None):
+    """
+    Return ``slug`` if no object in ``queryset`` uses it, otherwise the
+    next free ``<slug>-<n>``.
+
+    Collisions are resolved with one query: it checks the slug itself and
+    finds the highest numeric suffix already taken, so the cost doesn't
+    grow with the number of existing duplicates.
+    """
+    exact, top = slug_usage(queryset, slug, max_length, exclude_pk)
+    if not exact:
+        return slug
+    return f'{_stem(slug, max_length)}-{top + 1}'
+
+
+def assign_slugs(objs, source_field, fallback, max_length=50):
+    """
+    Give every object in ``objs`` without a slug a unique one, for
+    ``bulk_create``.
+
+    One query per distinct base slug. The first object of a group gets the
+    base slug if it is free; the others get suffixes above the highest one
+    already stored, even when the base slug itself is free.
+    """
+    pending = defaultdict(list)
+    for obj in objs:
+        if not obj.slug:
+            pending[base_slug(getattr(obj, source_field), fallback, max_length)].append(obj)
+    if not pending:
+        return
+
+    model = type(objs[0])
+    batch_slugs = {obj.slug for obj in objs if obj.slug}
+    for slug, group in pending.items():
+        stem = _stem(slug, max_length)
+        exact, counter = slug_usage(model._default_manager.all(), slug, max_length)
+        bare_free = not exact
+        for obj in group:
+            if bare_free and slug not in batch_slugs:
+                candidate = slug
+            else:
+                counter += 1
+                candidate = f'{stem}-{counter}'
+                while candidate in batch_slugs:
+                    counter += 1
+                    candidate = f'{stem}-{counter}'
+            bare_free = False
+            obj.slug = candidate
+            batch_slugs.add(candidate)
+
+
+class SlugQuerySet(models.QuerySet):
+    """QuerySet whose ``bulk_create`` fills in missing slugs"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        model = self.model
+        assign_slugs(objs, model.slug_source_field, model.slug_fallback, model._meta.get_field('slug').max_length)
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class UniqueSlugMixin:
+    """
+    Fill in a unique slug from ``slug_source_field`` when a model is saved
+    without one.
+
+    Two objects created at once can pick the same slug; the loser's insert
+    fails on the unique constraint inside a savepoint and is retried with a
+    freshly allocated slug.
+    """
+    slug_source_field = 'name'
+    slug_fallback = 'item'
+
+    def save(self, *args, **kwargs):
+        if self.slug or not getattr(self, self.slug_source_field):
+            return super().save(*args, **kwargs)
+
+        max_length = self._meta.get_field('slug').max_length
+        slug = base_slug(getattr(self, self.slug_source_field), self.slug_fallback, max_length)
+        for attempt in range(SAVE_ATTEMPTS):
+            self.slug = unique_slug(type(self)._default_manager.all(), slug, max_length, exclude_pk=self.pk)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if attempt == SAVE_ATTEMPTS - 1 or not type(self)._default_manager.filter(slug=self.slug).exists():
+                    self.slug = ''
+                    raise
@@ -0,0 +1,28 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.deconstruct import deconstructible
+from storages.backends.s3boto3 import S3Boto3Storage
+
+
+@deconstructible(path='core.storage.MediaStorage')
+class MediaStorage(S3Boto3Storage):
+    """
+    S3 storage of uploaded media, shared by every file field.
+
+    With ``AWS_QUERYSTRING_AUTH`` off a file's URL depends only on its
+    name, so plain ``url()`` calls are answered from a per-process LRU
+    cache of ``MEDIA_URL_CACHE_SIZE`` names.
+    """
+
+    def __init__(self, **settings_overrides):
+        super().__init__(**settings_overrides)
+        self._cached_url = lru_cache(maxsize=settings.MEDIA_URL_CACHE_SIZE)(super().url)
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        if self.querystring_auth or parameters or expire or http_method:
+            return super().url(name, parameters, expire, http_method)
+        return self._cached_url(name)
+
+
+media_storage = MediaStorage()
@@ -0,0 +1,11 @@
+from django import template
+
+from core.images import image_srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def srcset(image):
+    """``srcset`` listing the WebP variants of an image field, e.g. ``srcset="{% srcset course.thumbnail %}"``"""
+    return image_srcset(image)
@@ -1,3 +1,26 @@
 from django.test import TestCase
 
-# Create your tests here.
+from blog.models import Category
+
+
+class AssignSlugsTests(TestCase):
+    def test_batch_suffixes_skip_stored_ones_when_base_slug_is_free(self):
+        Category.objects.create(name='Python')
+        Category.objects.create(name='Python')
+        Category.objects.filter(slug='python').delete()
+
+        created = Category.objects.bulk_create([Category(name='Python'), Category(name='Python')])
+
+        self.assertEqual([category.slug for category in created], ['python', 'python-2'])
+        self.assertEqual(
+            sorted(Category.objects.values_list('slug', flat=True)),
+            ['python', 'python-1', 'python-2'],
+        )
+
+    def test_batch_suffixes_follow_the_highest_stored_one(self):
+        Category.objects.create(name='Python')
+        Category.objects.create(name='Python')
+
+        created = Category.objects.bulk_create([Category(name='Python'), Category(name='Python')])
+
+        self.assertEqual([category.slug for category in created], ['python-2', 'python-3'])
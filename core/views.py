@@ -1,9 +1,17 @@
+from django.conf import settings
 from django.shortcuts import render
-from .models import SiteSettings
 from courses.models import Course
 
-def home(request):
-    site_settings = SiteSettings.objects.first()
-    courses = Course.objects.all()
-    return render(request, 'home.html', {'site_settings': site_settings, 'courses': courses})
+FEATURED_COURSES_LIMIT = 6
+
 
+def home(request):
+    # Lazy queryset, only evaluated when the cached fragment is rebuilt
+    featured_courses = Course.objects.filter(
+        status='published',
+        is_featured=True,
+    ).select_related('instructor__user').order_by('-created_at')[:FEATURED_COURSES_LIMIT]
+    return render(request, 'home.html', {
+        'featured_courses': featured_courses,
+        'home_cache_timeout': settings.HOME_CACHE_TIMEOUT,
+    })
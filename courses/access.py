@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Exists, OuterRef, Q
+
+from payments.models import Order
+from .models import Course, Enrollment
+
+
+def access_cache_key(user_id, course_id):
+    return f'courses:access:{user_id}:{course_id}'
+
+
+def invalidate_course_access(user_id, course_id):
+    cache.delete(access_cache_key(user_id, course_id))
+
+
+def _memo(request):
+    """Per-request answers, so repeated checks in one request are free"""
+    memo = getattr(request, '_course_access', None)
+    if memo is None:
+        memo = request._course_access = {}
+    return memo
+
+
+def has_course_access(request, course):
+    """
+    Whether the current user owns ``course``: an enrollment, or a completed
+    order whose enrollment hasn't been recorded yet.
+
+    Answers are memoized on the request and cached for
+    ``COURSE_ACCESS_CACHE_TIMEOUT`` seconds; a miss costs one query.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return False
+
+    memo = _memo(request)
+    if course.id in memo:
+        return memo[course.id]
+
+    key = access_cache_key(user.id, course.id)
+    allowed = cache.get(key)
+    if allowed is None:
+        enrolled = Enrollment.objects.filter(student=user, course=OuterRef('pk'))
+        purchased = Order.objects.filter(user=user, course=OuterRef('pk'), status='completed')
+        allowed = Course.objects.filter(pk=course.id).filter(
+            Q(Exists(enrolled)) | Q(Exists(purchased))
+        ).exists()
+        cache.set(key, allowed, settings.COURSE_ACCESS_CACHE_TIMEOUT)
+
+    memo[course.id] = allowed
+    return allowed
+
+
+def get_enrollment(request, course):
+    """
+    Return the current user's ``Enrollment`` in ``course`` or None.
+
+    Fetching the row is itself the access check, so this is one query. A
+    user with a completed order but no enrollment gets one created.
+    """
+    user = request.user
+    if not user.is_authenticated:
+        return None
+
+    memo = _memo(request)
+    if memo.get(course.id) is False or cache.get(access_cache_key(user.id, course.id)) is False:
+        memo[course.id] = False
+        return None
+
+    enrollment = Enrollment.objects.filter(student=user, course=course).first()
+    if enrollment is None and has_course_access(request, course):
+        # Paid through a completed order before the enrollment was recorded
+        enrollment, _created = Enrollment.objects.get_or_create(student=user, course=course)
+
+    memo[course.id] = enrollment is not None
+    return enrollment
@@ -1,12 +1,21 @@
 from django.contrib import admin
 from modeltranslation.admin import TranslationAdmin
-from .models import Course, Lesson, Instructor, Review, Comment, Enrollment, LessonProgress
+from .models import Course, Lesson, Instructor, Review, Comment, Enrollment, LessonProgress, VideoUpload
 
-admin.site.register(Course)
+
+class CounterFieldsAdmin(admin.ModelAdmin):
+    """Shows the F()-maintained counters of a model without letting them be edited"""
+
+    def get_readonly_fields(self, request, obj=None):
+        return self.model.counter_fields
+
+
+admin.site.register(Course, CounterFieldsAdmin)
 admin.site.register(Lesson)
-admin.site.register(Instructor)
+admin.site.register(Instructor, CounterFieldsAdmin)
 admin.site.register(Review)
 admin.site.register(Comment)
-admin.site.register(Enrollment)
+admin.site.register(Enrollment, CounterFieldsAdmin)
 admin.site.register(LessonProgress)
+admin.site.register(VideoUpload)
 # Register your models here.
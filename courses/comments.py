@@ -0,0 +1,53 @@
+from django.core.paginator import Paginator
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+
+from .models import Comment
+
+THREADS_PER_PAGE = 10
+REPLIES_PER_THREAD = 3
+
+
+def thread_replies(root_ids, offset=0, limit=REPLIES_PER_THREAD):
+    """
+    Active replies of each thread in ``root_ids``, oldest first, keeping
+    positions ``offset + 1`` to ``offset + limit`` of every thread.
+
+    Replies at any depth are fetched through their ``root`` in one query,
+    numbered per thread by a window function.
+    """
+    return Comment.objects.filter(root_id__in=root_ids, is_active=True).select_related(
+        'user', 'parent__user'
+    ).annotate(
+        position=Window(
+            RowNumber(),
+            partition_by=[F('root_id')],
+            order_by=[F('created_at').asc(), F('id').asc()],
+        )
+    ).filter(position__gt=offset, position__lte=offset + limit).order_by('root_id', 'position')
+
+
+def load_comment_threads(lesson, page_number=None):
+    """
+    Return a page of the lesson's active threads.
+
+    Each root comment on the page carries ``reply_count`` (active replies
+    at any depth), ``replies`` (the first ``REPLIES_PER_THREAD`` of them)
+    and ``more_replies``. The page costs three queries however large the
+    threads are: the count, the roots and the replies.
+    """
+    roots = lesson.comments.filter(parent__isnull=True, is_active=True).select_related('user').annotate(
+        reply_count=Count('thread_replies', filter=Q(thread_replies__is_active=True))
+    ).order_by('created_at', 'id')
+    page = Paginator(roots, THREADS_PER_PAGE).get_page(page_number)
+
+    page.object_list = list(page.object_list)
+    threads = {root.id: root for root in page.object_list}
+    for root in threads.values():
+        root.replies = []
+    if any(root.reply_count for root in threads.values()):
+        for reply in thread_replies([root_id for root_id, root in threads.items() if root.reply_count]):
+            threads[reply.root_id].replies.append(reply)
+    for root in threads.values():
+        root.more_replies = root.reply_count - len(root.replies)
+    return page
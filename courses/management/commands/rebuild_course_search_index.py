@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from courses.models import Course
+from courses.search import course_index, index_course
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for all courses'
+
+    def handle(self, *args, **options):
+        if not course_index.is_supported:
+            self.stdout.write(self.style.WARNING('Full-text search is not supported on this database, skipping.'))
+            return
+
+        count = 0
+        with transaction.atomic():
+            course_index.clear()
+            for course in Course.objects.select_related('instructor__user').iterator(chunk_size=500):
+                index_course(course)
+                count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} courses.'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from courses.models import Enrollment
+from courses.progress import rebuild_enrollment_counters
+
+
+class Command(BaseCommand):
+    help = 'Recount completed and total lessons for every enrollment'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', help='Only rebuild enrollments of the course with this slug')
+
+    def handle(self, *args, **options):
+        enrollments = Enrollment.objects.all()
+        if options['course']:
+            enrollments = enrollments.filter(course__slug=options['course'])
+
+        changed = rebuild_enrollment_counters(enrollments)
+        self.stdout.write(self.style.SUCCESS(f'Corrected {changed} enrollments.'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from courses.stats import reconcile_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute enrolled students per course and course/student totals per instructor'
+
+    def handle(self, *args, **options):
+        courses, instructors = reconcile_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Corrected {courses} courses and {instructors} instructors.'
+        ))
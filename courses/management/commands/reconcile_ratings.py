@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from courses.ratings import reconcile_ratings
+
+
+class Command(BaseCommand):
+    help = 'Recompute course and instructor ratings from the reviews table'
+
+    def handle(self, *args, **options):
+        courses, instructors = reconcile_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Corrected {courses} courses and {instructors} instructors.'
+        ))
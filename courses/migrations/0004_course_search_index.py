@@ -0,0 +1,40 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE courses_course_search ("
+            " object_id bigint NOT NULL REFERENCES courses_course (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,"
+            " language varchar(10) NOT NULL,"
+            " document tsvector NOT NULL,"
+            " PRIMARY KEY (object_id, language))"
+        )
+        schema_editor.execute(
+            "CREATE INDEX courses_course_search_document_gin "
+            "ON courses_course_search USING GIN (document)"
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE courses_course_search USING fts5("
+            " object_id UNINDEXED, language UNINDEXED,"
+            " title, short_description, description, instructor,"
+            " tokenize = 'unicode61 remove_diacritics 2')"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute("DROP TABLE IF EXISTS courses_course_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_alter_course_thumbnail_alter_course_video_preview_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
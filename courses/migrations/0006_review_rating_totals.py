@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:02
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_rating_totals(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Instructor = apps.get_model('courses', 'Instructor')
+    Review = apps.get_model('courses', 'Review')
+
+    for row in Review.objects.values('course').annotate(total=Sum('rating'), count=Count('id')):
+        Course.objects.filter(pk=row['course']).update(rating_total=row['total'], total_reviews=row['count'])
+
+    for row in Review.objects.values('course__instructor').annotate(total=Sum('rating'), count=Count('id')):
+        Instructor.objects.filter(pk=row['course__instructor']).update(
+            rating_total=row['total'],
+            total_reviews=row['count'],
+            rating=round(row['total'] / row['count'], 2),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_course_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='rating_total',
+            field=models.PositiveIntegerField(default=0, help_text='Sum of all review ratings'),
+        ),
+        migrations.AddField(
+            model_name='instructor',
+            name='rating_total',
+            field=models.PositiveIntegerField(default=0, help_text="Sum of all review ratings on the instructor's courses"),
+        ),
+        migrations.AddField(
+            model_name='instructor',
+            name='total_reviews',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_rating_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:04
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_lesson_counters(apps, schema_editor):
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    Lesson = apps.get_model('courses', 'Lesson')
+    LessonProgress = apps.get_model('courses', 'LessonProgress')
+
+    lesson_count = Lesson.objects.filter(course=OuterRef('course')).order_by().values('course').annotate(
+        count=Count('id')
+    ).values('count')
+    completed_count = LessonProgress.objects.filter(
+        enrollment=OuterRef('pk'), is_completed=True
+    ).values('enrollment').annotate(count=Count('id')).values('count')
+
+    Enrollment.objects.update(
+        total_lessons=Coalesce(Subquery(lesson_count, output_field=IntegerField()), Value(0)),
+        completed_lessons=Coalesce(Subquery(completed_count, output_field=IntegerField()), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_review_rating_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='completed_lessons',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='total_lessons',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_lesson_counters, migrations.RunPython.noop),
+    ]
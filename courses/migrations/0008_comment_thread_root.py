@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+
+def populate_thread_roots(apps, schema_editor):
+    Comment = apps.get_model('courses', 'Comment')
+
+    # Direct replies first, then walk down one level per pass
+    Comment.objects.filter(parent__isnull=False, parent__parent__isnull=True).update(root=F('parent'))
+    while True:
+        parent_root = Comment.objects.filter(pk=OuterRef('parent')).values('root')[:1]
+        updated = Comment.objects.filter(
+            root__isnull=True, parent__isnull=False, parent__root__isnull=False
+        ).update(root=Subquery(parent_root))
+        if not updated:
+            break
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_enrollment_lesson_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='root',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='thread_replies', to='courses.comment'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['lesson', 'parent', 'is_active', 'created_at'], name='comment_lesson_threads_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['root', 'is_active', 'created_at'], name='comment_thread_replies_idx'),
+        ),
+        migrations.RunPython(populate_thread_roots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:17
+
+from django.db import migrations
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_stats(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Enrollment = apps.get_model('courses', 'Enrollment')
+    Instructor = apps.get_model('courses', 'Instructor')
+
+    enrollment_count = Enrollment.objects.filter(course=OuterRef('pk')).order_by().values('course').annotate(
+        count=Count('id')
+    ).values('count')
+    Course.objects.update(
+        enrolled_students=Coalesce(Subquery(enrollment_count, output_field=IntegerField()), Value(0)),
+    )
+
+    published_count = Course.objects.filter(instructor=OuterRef('pk'), status='published').order_by().values(
+        'instructor'
+    ).annotate(count=Count('id')).values('count')
+    student_count = Course.objects.filter(instructor=OuterRef('pk')).order_by().values('instructor').annotate(
+        count=Sum('enrolled_students')
+    ).values('count')
+    Instructor.objects.update(
+        total_courses=Coalesce(Subquery(published_count, output_field=IntegerField()), Value(0)),
+        total_students=Coalesce(Subquery(student_count, output_field=IntegerField()), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0008_comment_thread_root'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 16:31
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0010_course_thumbnail_widths'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='course',
+            name='thumbnail',
+            field=models.ImageField(storage=core.storage.MediaStorage(), upload_to='courses/thumbnails/'),
+        ),
+        migrations.AlterField(
+            model_name='course',
+            name='video_preview',
+            field=models.FileField(blank=True, storage=core.storage.MediaStorage(), upload_to='courses/previews/'),
+        ),
+        migrations.AlterField(
+            model_name='lesson',
+            name='video_file',
+            field=models.FileField(storage=core.storage.MediaStorage(), upload_to='courses/videos/'),
+        ),
+    ]
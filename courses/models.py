@@ -1,20 +1,45 @@
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from accounts.models import User
-from storages.backends.s3boto3 import S3Boto3Storage
+from core.storage import media_storage
 
 
-class Instructor(models.Model):
+class CounterFieldsMixin:
+    """
+    Leave ``counter_fields`` out of full saves of existing rows.
+
+    The counters are kept current with ``F()`` updates behind the
+    instance's back, so writing back its in-memory copies (e.g. from an
+    admin form) would undo every change made since it was loaded. Saves
+    that name the counters in ``update_fields`` still write them.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if kwargs.get('update_fields') is None and not kwargs.get('force_insert') and not self._state.adding:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.counter_fields and field.attname not in deferred
+            ]
+        return super().save(*args, **kwargs)
+
+
+class Instructor(CounterFieldsMixin, models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     expertise = models.TextField()
     experience_years = models.PositiveIntegerField(default=0)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+    rating_total = models.PositiveIntegerField(default=0, help_text="Sum of all review ratings on the instructor's courses")
+    total_reviews = models.PositiveIntegerField(default=0)
     total_students = models.PositiveIntegerField(default=0)
     total_courses = models.PositiveIntegerField(default=0)
     is_featured = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    counter_fields = ('rating', 'rating_total', 'total_reviews', 'total_students', 'total_courses')
+    
     class Meta:
         verbose_name = 'Instructor'
         verbose_name_plural = 'Instructors'
@@ -23,7 +48,7 @@ class Instructor(models.Model):
         return f"Instructor: {self.user.get_full_name()}"
 
 
-class Course(models.Model):
+class Course(CounterFieldsMixin, models.Model):
     DIFFICULTY_CHOICES = [
         ('beginner', _('Beginner')),
         ('intermediate', _('Intermediate')),
@@ -43,8 +68,9 @@ class Course(models.Model):
     
     instructor = models.ForeignKey(Instructor, on_delete=models.CASCADE)
     
-    thumbnail = models.ImageField(upload_to='courses/thumbnails/', storage=S3Boto3Storage())
-    video_preview = models.FileField(upload_to='courses/previews/', storage=S3Boto3Storage(), blank=True)
+    thumbnail = models.ImageField(upload_to='courses/thumbnails/', storage=media_storage)
+    thumbnail_widths = models.JSONField(default=list, blank=True, editable=False)
+    video_preview = models.FileField(upload_to='courses/previews/', storage=media_storage, blank=True)
     
     price = models.DecimalField(max_digits=10, decimal_places=2)
     discount_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
@@ -64,11 +90,21 @@ class Course(models.Model):
     # Statistics
     enrolled_students = models.PositiveIntegerField(default=0)
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.00)
+    rating_total = models.PositiveIntegerField(default=0, help_text="Sum of all review ratings")
     total_reviews = models.PositiveIntegerField(default=0)
     
+    counter_fields = ('enrolled_students', 'rating', 'rating_total', 'total_reviews')
+    
     class Meta:
         verbose_name = 'Course'
         verbose_name_plural = 'Courses'
+        indexes = [
+            # Catalog seek pagination, one per sort order
+            models.Index(fields=['status', '-created_at', '-id'], name='course_status_created_idx'),
+            models.Index(fields=['status', 'price', 'id'], name='course_status_price_idx'),
+            models.Index(fields=['status', '-rating', '-id'], name='course_status_rating_idx'),
+            models.Index(fields=['status', '-enrolled_students', '-id'], name='course_status_students_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -89,7 +125,7 @@ class Lesson(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     
-    video_file = models.FileField(upload_to='courses/videos/', storage=S3Boto3Storage())
+    video_file = models.FileField(upload_to='courses/videos/', storage=media_storage)
     duration_minutes = models.PositiveIntegerField()
     order = models.PositiveIntegerField(default=0)
     
@@ -103,15 +139,19 @@ class Lesson(models.Model):
         return f"{self.course.title} - {self.title}"
 
 
-class Enrollment(models.Model):
+class Enrollment(CounterFieldsMixin, models.Model):
     """Student enrollment in courses"""
     student = models.ForeignKey(User, on_delete=models.CASCADE)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     enrolled_at = models.DateTimeField(auto_now_add=True)
     progress = models.PositiveIntegerField(default=0)  # Progress percentage
+    completed_lessons = models.PositiveIntegerField(default=0)
+    total_lessons = models.PositiveIntegerField(default=0)
     is_completed = models.BooleanField(default=False)
     completed_at = models.DateTimeField(null=True, blank=True)
     
+    counter_fields = ('progress', 'completed_lessons', 'total_lessons')
+    
     class Meta:
         unique_together = ['student', 'course']
     
@@ -149,6 +189,8 @@ class Comment(models.Model):
     lesson = models.ForeignKey(Lesson, related_name='comments', on_delete=models.CASCADE)
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='children')
+    # Top-level comment of the thread, so a whole thread loads with one lookup
+    root = models.ForeignKey('self', null=True, blank=True, editable=False, on_delete=models.CASCADE, related_name='thread_replies')
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -156,6 +198,57 @@ class Comment(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['lesson', 'parent', 'is_active', 'created_at'], name='comment_lesson_threads_idx'),
+            models.Index(fields=['root', 'is_active', 'created_at'], name='comment_thread_replies_idx'),
+        ]
     
     def __str__(self):
         return f"Comment by {self.user.username} on {self.lesson.title}"
+    
+    def save(self, *args, **kwargs):
+        if self.parent_id and not self.root_id:
+            self.root_id = self.parent.root_id or self.parent_id
+        super().save(*args, **kwargs)
+
+
+class VideoUpload(models.Model):
+    """
+    Multipart upload of a video straight from the browser to S3.
+
+    The parts themselves are tracked by S3; this row remembers the upload
+    so it can be resumed, and which file field it fills once completed.
+    """
+    STATUS = [
+        ('uploading', _('Uploading')),
+        ('completed', _('Completed')),
+        ('aborted', _('Aborted')),
+    ]
+    
+    uploader = models.ForeignKey(User, on_delete=models.CASCADE)
+    course = models.ForeignKey(Course, related_name='video_uploads', on_delete=models.CASCADE)
+    # Lesson video when set, otherwise the course preview
+    lesson = models.ForeignKey(Lesson, related_name='video_uploads', null=True, blank=True, on_delete=models.CASCADE)
+    
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.PositiveBigIntegerField()
+    part_size = models.PositiveBigIntegerField()
+    name = models.CharField(max_length=500)  # Storage name the video is written to
+    upload_id = models.CharField(max_length=1024)  # S3 multipart UploadId
+    
+    status = models.CharField(max_length=20, choices=STATUS, default='uploading')
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['uploader', 'status'], name='video_upload_resume_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+    
+    @property
+    def part_count(self):
+        return max(1, -(-self.size // self.part_size))
@@ -0,0 +1,72 @@
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from .models import Lesson
+
+LessonEntry = namedtuple('LessonEntry', 'id title duration_minutes is_free')
+
+
+def lesson_index_key(course_id, language):
+    return f'courses:lesson_index:{course_id}:{language}'
+
+
+def invalidate_lesson_index(course_id):
+    cache.delete_many([lesson_index_key(course_id, code) for code, _name in settings.LANGUAGES])
+
+
+class LessonIndex:
+    """
+    Ordered lessons of one course, reduced to what navigation needs.
+
+    Positions are resolved through a dict, so previous/next lookups and
+    the lesson count don't depend on the length of the course.
+    """
+
+    def __init__(self, entries):
+        self.entries = tuple(entries)
+        self._positions = {entry.id: position for position, entry in enumerate(self.entries)}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, lesson_id):
+        return lesson_id in self._positions
+
+    def position(self, lesson_id):
+        return self._positions.get(lesson_id)
+
+    def previous(self, lesson_id):
+        position = self._positions.get(lesson_id)
+        if not position:
+            return None
+        return self.entries[position - 1]
+
+    def next(self, lesson_id):
+        position = self._positions.get(lesson_id)
+        if position is None or position + 1 >= len(self.entries):
+            return None
+        return self.entries[position + 1]
+
+
+def get_lesson_index(course_id):
+    """
+    Return the ``LessonIndex`` of a course in the active language.
+
+    Built with one narrow query on a miss and cached until a lesson of the
+    course is saved or deleted.
+    """
+    key = lesson_index_key(course_id, get_language() or settings.LANGUAGE_CODE)
+    index = cache.get(key)
+    if index is None:
+        lessons = Lesson.objects.filter(course_id=course_id).order_by('order', 'id').only(
+            'id', 'title', 'duration_minutes', 'is_free'
+        )
+        index = LessonIndex(
+            LessonEntry(lesson.id, lesson.title, lesson.duration_minutes, lesson.is_free)
+            for lesson in lessons
+        )
+        cache.set(key, index, settings.LESSON_INDEX_CACHE_TIMEOUT)
+    return index
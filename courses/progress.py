@@ -0,0 +1,259 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict, namedtuple
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
+
+from .models import Enrollment, Lesson, LessonProgress
+
+logger = logging.getLogger(__name__)
+
+# A lesson counts as completed once this share of it has been watched
+COMPLETION_RATIO = 0.9
+
+Heartbeat = namedtuple('Heartbeat', 'enrollment_id lesson_id watched_duration duration_seconds')
+
+FlushResult = namedtuple('FlushResult', 'completed progress')
+
+
+def is_complete(watched_duration, duration_seconds):
+    return watched_duration >= duration_seconds * COMPLETION_RATIO
+
+
+def adjust_enrollment_counters(enrollments, completed_delta=0, total_delta=0):
+    """
+    Shift the lesson counters of an Enrollment queryset and recompute
+    ``progress`` from them in the same UPDATE.
+    """
+    if not completed_delta and not total_delta:
+        return
+    completed = F('completed_lessons') + completed_delta
+    total = F('total_lessons') + total_delta
+    enrollments.update(
+        completed_lessons=completed,
+        total_lessons=total,
+        progress=Case(
+            When(total_lessons__gt=-total_delta, then=Least(completed * 100 / total, Value(100))),
+            default=Value(0),
+        ),
+    )
+    enrollments.filter(progress=100, is_completed=False).update(
+        is_completed=True,
+        completed_at=timezone.now(),
+    )
+
+
+def rebuild_enrollment_counters(enrollments=None):
+    """Recount lessons and completed lessons for enrollments, return how many changed"""
+    if enrollments is None:
+        enrollments = Enrollment.objects.all()
+
+    lesson_count = Lesson.objects.filter(course=OuterRef('course')).order_by().values('course').annotate(
+        count=Count('id')
+    ).values('count')
+    completed_count = LessonProgress.objects.filter(
+        enrollment=OuterRef('pk'), is_completed=True
+    ).values('enrollment').annotate(count=Count('id')).values('count')
+
+    rows = enrollments.annotate(
+        actual_total=Coalesce(Subquery(lesson_count, output_field=IntegerField()), Value(0)),
+        actual_completed=Coalesce(Subquery(completed_count, output_field=IntegerField()), Value(0)),
+    ).only('id', 'completed_lessons', 'total_lessons', 'progress', 'is_completed', 'completed_at')
+
+    now = timezone.now()
+    changed = []
+    for enrollment in rows.iterator(chunk_size=1000):
+        total, completed = enrollment.actual_total, enrollment.actual_completed
+        progress = min(100, completed * 100 // total) if total else 0
+        if (enrollment.total_lessons, enrollment.completed_lessons, enrollment.progress) == (total, completed, progress):
+            continue
+        enrollment.total_lessons = total
+        enrollment.completed_lessons = completed
+        enrollment.progress = progress
+        if progress == 100 and not enrollment.is_completed:
+            enrollment.is_completed = True
+            enrollment.completed_at = now
+        changed.append(enrollment)
+    Enrollment.objects.bulk_update(
+        changed,
+        ['total_lessons', 'completed_lessons', 'progress', 'is_completed', 'completed_at'],
+        batch_size=500,
+    )
+    return len(changed)
+
+
+class ProgressBuffer:
+    """
+    Coalesces video heartbeats per (enrollment, lesson) before writing them.
+
+    Only the furthest watched position of each pair is kept. Pending
+    heartbeats are written in one transaction once ``flush_interval``
+    seconds have passed, ``max_pending`` pairs are waiting, or a heartbeat
+    completes a lesson; enrollment counters only move for lessons that flip
+    to completed.
+    """
+
+    def __init__(self, flush_interval, max_pending):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def add(self, heartbeats):
+        completes_lesson = False
+        with self._lock:
+            for heartbeat in heartbeats:
+                key = (heartbeat.enrollment_id, heartbeat.lesson_id)
+                current = self._pending.get(key)
+                if current is None or heartbeat.watched_duration > current.watched_duration:
+                    self._pending[key] = heartbeat
+                completes_lesson = completes_lesson or is_complete(
+                    heartbeat.watched_duration, heartbeat.duration_seconds
+                )
+            due = (
+                completes_lesson
+                or len(self._pending) >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            return self.flush()
+        return FlushResult(completed=set(), progress={})
+
+    def flush(self):
+        """
+        Write pending heartbeats, return the pairs that flipped to completed
+        and the progress of their enrollments.
+
+        The pairs' rows are created if missing and then locked, so
+        concurrent flushes of the same pair serialize: a completion is
+        counted once and never reverted, and the watched position only
+        moves forward. A failed flush puts its heartbeats back in the
+        buffer.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return FlushResult(completed=set(), progress={})
+
+        try:
+            with transaction.atomic():
+                newly_completed = self._write(pending)
+        except DatabaseError:
+            logger.exception("Failed to flush lesson progress, keeping it buffered")
+            self._restore(pending)
+            return FlushResult(completed=set(), progress={})
+
+        completions = {enrollment_id for enrollment_id, _lesson_id in newly_completed}
+        progress = dict(
+            Enrollment.objects.filter(id__in=completions).values_list('id', 'progress')
+        ) if completions else {}
+
+        return FlushResult(completed=newly_completed, progress=progress)
+
+    def _write(self, pending):
+        keys = sorted(pending)
+        # Make sure every pair has a row to lock; existing rows are left alone
+        LessonProgress.objects.bulk_create(
+            [LessonProgress(enrollment_id=enrollment_id, lesson_id=lesson_id) for enrollment_id, lesson_id in keys],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+        rows = LessonProgress.objects.select_for_update().filter(
+            enrollment_id__in={key[0] for key in keys},
+            lesson_id__in={key[1] for key in keys},
+        ).order_by('enrollment_id', 'lesson_id').only(
+            'id', 'enrollment_id', 'lesson_id', 'watched_duration', 'is_completed', 'completed_at'
+        )
+
+        now = timezone.now()
+        changed = []
+        newly_completed = set()
+        for row in rows:
+            key = (row.enrollment_id, row.lesson_id)
+            heartbeat = pending.get(key)
+            if heartbeat is None:
+                continue
+            watched_duration = max(row.watched_duration, heartbeat.watched_duration)
+            completes = not row.is_completed and is_complete(watched_duration, heartbeat.duration_seconds)
+            if watched_duration == row.watched_duration and not completes:
+                continue
+            row.watched_duration = watched_duration
+            if completes:
+                row.is_completed = True
+                row.completed_at = now
+                newly_completed.add(key)
+            changed.append(row)
+        LessonProgress.objects.bulk_update(
+            changed, ['watched_duration', 'is_completed', 'completed_at'], batch_size=500
+        )
+
+        completions = Counter(enrollment_id for enrollment_id, _lesson_id in newly_completed)
+        by_increment = defaultdict(list)
+        for enrollment_id, count in completions.items():
+            by_increment[count].append(enrollment_id)
+        for count, enrollment_ids in by_increment.items():
+            adjust_enrollment_counters(Enrollment.objects.filter(id__in=enrollment_ids), completed_delta=count)
+        return newly_completed
+
+    def _restore(self, pending):
+        with self._lock:
+            for key, heartbeat in pending.items():
+                current = self._pending.get(key)
+                if current is None or heartbeat.watched_duration > current.watched_duration:
+                    self._pending[key] = heartbeat
+
+
+progress_buffer = ProgressBuffer(
+    flush_interval=settings.LESSON_PROGRESS_FLUSH_INTERVAL,
+    max_pending=settings.LESSON_PROGRESS_MAX_PENDING,
+)
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        progress_buffer.flush()
+    except Exception:
+        logger.exception("Failed to flush lesson progress on exit")
+
+
+def record_heartbeats(user, items):
+    """
+    Validate raw ``(lesson_id, watched_duration)`` pairs for ``user`` and
+    queue them. Lessons the user is not enrolled in are ignored.
+
+    Returns ``(accepted_lesson_ids, FlushResult)``.
+    """
+    lesson_ids = {lesson_id for lesson_id, _watched in items}
+    # One query resolves every lesson's duration and the user's enrollment
+    lessons = {
+        lesson_id: (enrollment_id, duration_minutes * 60)
+        for lesson_id, enrollment_id, duration_minutes in Lesson.objects.filter(
+            id__in=lesson_ids,
+            course__enrollment__student=user,
+        ).values_list('id', 'course__enrollment__id', 'duration_minutes')
+    }
+
+    heartbeats = []
+    for lesson_id, watched_duration in items:
+        if lesson_id not in lessons:
+            continue
+        enrollment_id, duration_seconds = lessons[lesson_id]
+        heartbeats.append(Heartbeat(enrollment_id, lesson_id, watched_duration, duration_seconds))
+
+    result = progress_buffer.add(heartbeats) if heartbeats else FlushResult(completed=set(), progress={})
+    # A flush writes every process-wide pending pair; only report the user's own
+    own = {heartbeat.enrollment_id for heartbeat in heartbeats}
+    result = FlushResult(
+        completed={key for key in result.completed if key[0] in own},
+        progress={enrollment_id: progress for enrollment_id, progress in result.progress.items() if enrollment_id in own},
+    )
+    return {heartbeat.lesson_id for heartbeat in heartbeats}, result
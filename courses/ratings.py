@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, FloatField, Sum, Count, Value, When
+from django.db.models.functions import Cast, Coalesce, Round
+
+from .models import Course, Instructor, Review
+
+
+def _running_average(total_field, count_field, rating_delta, count_delta):
+    """
+    Build ``round((total + rating_delta) / (count + count_delta), 2)``,
+    evaluated by the database on the values it is about to overwrite.
+    """
+    new_total = F(total_field) + rating_delta
+    new_count = F(count_field) + count_delta
+    average = Round(
+        Cast(Cast(new_total, FloatField()) / new_count, DecimalField(max_digits=3, decimal_places=2)),
+        2,
+    )
+    return Case(
+        When(**{f'{count_field}__gt': -count_delta}, then=average),
+        default=Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=3, decimal_places=2),
+    )
+
+
+def apply_review_change(course_id, rating_delta, count_delta):
+    """
+    Fold one review change into the stored course and instructor aggregates.
+
+    Each aggregate is a single conditional UPDATE on running sums, so adding
+    a review is O(1) and concurrent reviewers never overwrite each other.
+    """
+    if not rating_delta and not count_delta:
+        return
+
+    Course.objects.filter(pk=course_id).update(
+        rating=_running_average('rating_total', 'total_reviews', rating_delta, count_delta),
+        rating_total=F('rating_total') + rating_delta,
+        total_reviews=F('total_reviews') + count_delta,
+    )
+    Instructor.objects.filter(course__pk=course_id).update(
+        rating=_running_average('rating_total', 'total_reviews', rating_delta, count_delta),
+        rating_total=F('rating_total') + rating_delta,
+        total_reviews=F('total_reviews') + count_delta,
+    )
+
+
+def _average(total, count):
+    if not count:
+        return Decimal('0.00')
+    return (Decimal(total) / count).quantize(Decimal('0.01'))
+
+
+def reconcile_ratings():
+    """
+    Recompute every course and instructor aggregate from the reviews table.
+
+    Returns the number of (courses, instructors) whose stored values drifted.
+    """
+    courses = Course.objects.annotate(
+        review_sum=Coalesce(Sum('reviews__rating'), 0),
+        review_count=Count('reviews'),
+    ).only('id', 'rating', 'rating_total', 'total_reviews')
+
+    changed_courses = []
+    for course in courses.iterator(chunk_size=1000):
+        rating = _average(course.review_sum, course.review_count)
+        if (course.rating_total, course.total_reviews, course.rating) != (course.review_sum, course.review_count, rating):
+            course.rating_total = course.review_sum
+            course.total_reviews = course.review_count
+            course.rating = rating
+            changed_courses.append(course)
+    Course.objects.bulk_update(changed_courses, ['rating', 'rating_total', 'total_reviews'], batch_size=500)
+
+    totals = {
+        row['course__instructor']: row
+        for row in Review.objects.values('course__instructor').annotate(
+            review_sum=Sum('rating'),
+            review_count=Count('id'),
+        )
+    }
+    changed_instructors = []
+    for instructor in Instructor.objects.only('id', 'rating', 'rating_total', 'total_reviews').iterator(chunk_size=1000):
+        row = totals.get(instructor.id, {'review_sum': 0, 'review_count': 0})
+        rating = _average(row['review_sum'], row['review_count'])
+        if (instructor.rating_total, instructor.total_reviews, instructor.rating) != (row['review_sum'], row['review_count'], rating):
+            instructor.rating_total = row['review_sum']
+            instructor.total_reviews = row['review_count']
+            instructor.rating = rating
+            changed_instructors.append(instructor)
+    Instructor.objects.bulk_update(changed_instructors, ['rating', 'rating_total', 'total_reviews'], batch_size=500)
+
+    return len(changed_courses), len(changed_instructors)
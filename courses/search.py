@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.utils import translation
+
+from core.search import SearchIndex
+
+
+course_index = SearchIndex(
+    table='courses_course_search',
+    model_table='courses_course',
+    fields=('title', 'short_description', 'description', 'instructor'),
+    fallback_lookups=('title', 'description', 'instructor__user__username'),
+)
+
+
+def _translated(course, field, language):
+    default = settings.MODELTRANSLATION_DEFAULT_LANGUAGE
+    return getattr(course, f'{field}_{language}', None) or getattr(course, f'{field}_{default}', None) or ''
+
+
+def index_course(course):
+    """Refresh the search index rows of a course for every site language"""
+    if not course_index.is_supported:
+        return
+    user = course.instructor.user
+    instructor = f"{user.get_full_name()} {user.username}"
+    for language, _name in settings.LANGUAGES:
+        course_index.update(course.id, language, {
+            'title': _translated(course, 'title', language),
+            'short_description': _translated(course, 'short_description', language),
+            'description': _translated(course, 'description', language),
+            'instructor': instructor,
+        })
+
+
+def unindex_course(course_id):
+    course_index.delete(course_id)
+
+
+def search_courses(queryset, query, language=None):
+    """Filter a Course queryset by ``query`` and annotate ``search_rank``"""
+    language = (language or translation.get_language() or settings.LANGUAGE_CODE)[:2]
+    return course_index.search(queryset, query, language)
@@ -0,0 +1,148 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from .access import invalidate_course_access
+from .models import Course, Review, Lesson, Enrollment, LessonProgress
+from .navigation import invalidate_lesson_index
+from .progress import adjust_enrollment_counters
+from .ratings import apply_review_change
+from .search import index_course, unindex_course
+from .stats import adjust_instructor, adjust_students
+
+
+@receiver(post_save, sender=Course)
+def update_course_search_index(sender, instance, raw=False, **kwargs):
+    """Keep the course search index in sync with the saved course"""
+    if raw:
+        return
+    index_course(instance)
+
+
+@receiver(post_delete, sender=Course)
+def remove_course_search_index(sender, instance, **kwargs):
+    unindex_course(instance.id)
+
+
+@receiver(pre_save, sender=Course)
+def remember_previous_listing(sender, instance, raw=False, **kwargs):
+    """Keep the stored status and instructor to move instructor stats on change"""
+    instance._previous_listing = None
+    if instance.pk and not raw:
+        instance._previous_listing = Course.objects.filter(pk=instance.pk).values(
+            'status', 'instructor_id', 'enrolled_students'
+        ).first()
+
+
+@receiver(post_save, sender=Course)
+def update_instructor_course_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    is_published = int(instance.status == 'published')
+    previous = instance._previous_listing
+    if created or previous is None:
+        adjust_instructor(instance.instructor_id, courses_delta=is_published)
+        return
+
+    was_published = int(previous['status'] == 'published')
+    if previous['instructor_id'] != instance.instructor_id:
+        students = previous['enrolled_students']
+        adjust_instructor(previous['instructor_id'], -was_published, -students)
+        adjust_instructor(instance.instructor_id, is_published, students)
+    else:
+        adjust_instructor(instance.instructor_id, courses_delta=is_published - was_published)
+
+
+@receiver(post_delete, sender=Course)
+def remove_course_from_instructor_stats(sender, instance, **kwargs):
+    """The course's enrollments were deleted first and already counted down"""
+    if instance.status == 'published':
+        adjust_instructor(instance.instructor_id, courses_delta=-1)
+
+
+@receiver(pre_save, sender=Review)
+def remember_previous_rating(sender, instance, raw=False, **kwargs):
+    """Keep the stored rating so an edited review only applies the difference"""
+    instance._previous_rating = None
+    if instance.pk and not raw:
+        instance._previous_rating = Review.objects.filter(pk=instance.pk).values_list('rating', flat=True).first()
+
+
+@receiver(post_save, sender=Review)
+def add_review_to_aggregates(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        apply_review_change(instance.course_id, instance.rating, 1)
+    elif instance._previous_rating is not None:
+        apply_review_change(instance.course_id, instance.rating - instance._previous_rating, 0)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_aggregates(sender, instance, **kwargs):
+    apply_review_change(instance.course_id, -instance.rating, -1)
+
+
+@receiver(pre_save, sender=Enrollment)
+def count_course_lessons(sender, instance, raw=False, **kwargs):
+    """A new enrollment starts with the course's current lesson count"""
+    if instance._state.adding and not raw:
+        instance.total_lessons = Lesson.objects.filter(course_id=instance.course_id).count()
+
+
+@receiver(post_save, sender=Lesson)
+def add_lesson_to_enrollments(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust_enrollment_counters(Enrollment.objects.filter(course_id=instance.course_id), total_delta=1)
+
+
+@receiver(post_delete, sender=Lesson)
+def remove_lesson_from_enrollments(sender, instance, **kwargs):
+    adjust_enrollment_counters(Enrollment.objects.filter(course_id=instance.course_id), total_delta=-1)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def clear_lesson_index(sender, instance, **kwargs):
+    invalidate_lesson_index(instance.course_id)
+
+
+@receiver(pre_save, sender=LessonProgress)
+def remember_previous_completion(sender, instance, raw=False, **kwargs):
+    instance._was_completed = False
+    if instance.pk and not raw:
+        instance._was_completed = LessonProgress.objects.filter(
+            pk=instance.pk, is_completed=True
+        ).exists()
+
+
+@receiver(post_save, sender=LessonProgress)
+def update_completed_lessons(sender, instance, raw=False, **kwargs):
+    """Bulk writes from the progress buffer adjust the counters themselves"""
+    if raw or instance.is_completed == instance._was_completed:
+        return
+    adjust_enrollment_counters(
+        Enrollment.objects.filter(pk=instance.enrollment_id),
+        completed_delta=1 if instance.is_completed else -1,
+    )
+
+
+@receiver(post_delete, sender=LessonProgress)
+def remove_completed_lesson(sender, instance, **kwargs):
+    if instance.is_completed:
+        adjust_enrollment_counters(Enrollment.objects.filter(pk=instance.enrollment_id), completed_delta=-1)
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def clear_course_access(sender, instance, **kwargs):
+    invalidate_course_access(instance.student_id, instance.course_id)
+
+
+@receiver(post_save, sender=Enrollment)
+def count_enrolled_student(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust_students(instance.course_id, 1)
+
+
+@receiver(post_delete, sender=Enrollment)
+def uncount_enrolled_student(sender, instance, **kwargs):
+    adjust_students(instance.course_id, -1)
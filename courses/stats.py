@@ -0,0 +1,70 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Course, Enrollment, Instructor
+
+
+def adjust_students(course_id, delta):
+    """
+    Shift the enrollment count of a course and of its instructor.
+
+    ``Instructor.total_students`` counts enrollments across all of the
+    instructor's courses, so both move together with atomic ``F()``
+    updates.
+    """
+    if not delta:
+        return
+    Course.objects.filter(pk=course_id).update(enrolled_students=F('enrolled_students') + delta)
+    Instructor.objects.filter(course__pk=course_id).update(total_students=F('total_students') + delta)
+
+
+def adjust_instructor(instructor_id, courses_delta=0, students_delta=0):
+    """Shift an instructor's published course and student counts"""
+    if not courses_delta and not students_delta:
+        return
+    Instructor.objects.filter(pk=instructor_id).update(
+        total_courses=F('total_courses') + courses_delta,
+        total_students=F('total_students') + students_delta,
+    )
+
+
+def reconcile_stats():
+    """
+    Recount enrolled students per course, and published courses and
+    students per instructor.
+
+    Returns the number of (courses, instructors) whose stored values drifted.
+    """
+    enrollment_count = Enrollment.objects.filter(course=OuterRef('pk')).order_by().values('course').annotate(
+        count=Count('id')
+    ).values('count')
+    courses = Course.objects.annotate(
+        actual_students=Coalesce(Subquery(enrollment_count, output_field=IntegerField()), Value(0)),
+    ).only('id', 'enrolled_students')
+
+    changed_courses = []
+    for course in courses.iterator(chunk_size=1000):
+        if course.enrolled_students != course.actual_students:
+            course.enrolled_students = course.actual_students
+            changed_courses.append(course)
+    Course.objects.bulk_update(changed_courses, ['enrolled_students'], batch_size=500)
+
+    published = {
+        row['instructor']: row['count']
+        for row in Course.objects.filter(status='published').order_by().values('instructor').annotate(count=Count('id'))
+    }
+    students = {
+        row['instructor']: row['count']
+        for row in Course.objects.order_by().values('instructor').annotate(count=Sum('enrolled_students'))
+    }
+    changed_instructors = []
+    for instructor in Instructor.objects.only('id', 'total_courses', 'total_students').iterator(chunk_size=1000):
+        total_courses = published.get(instructor.id, 0)
+        total_students = students.get(instructor.id) or 0
+        if (instructor.total_courses, instructor.total_students) != (total_courses, total_students):
+            instructor.total_courses = total_courses
+            instructor.total_students = total_students
+            changed_instructors.append(instructor)
+    Instructor.objects.bulk_update(changed_instructors, ['total_courses', 'total_students'], batch_size=500)
+
+    return len(changed_courses), len(changed_instructors)
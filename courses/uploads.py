@@ -0,0 +1,241 @@
+import functools
+import logging
+import os
+import uuid
+
+from botocore.exceptions import BotoCoreError, ClientError
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext as _
+from storages.utils import clean_name
+
+from core.storage import media_storage
+from .models import Course, Lesson, VideoUpload
+
+logger = logging.getLogger(__name__)
+
+# S3 limits on multipart uploads
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+# Largest number of part URLs signed per request
+MAX_PRESIGNED_PARTS = 100
+
+
+class UploadError(Exception):
+    """An upload request that can't be served, with a message for the user"""
+
+
+class StorageError(UploadError):
+    """S3 failed or couldn't be reached"""
+
+
+def _storage_errors(func):
+    """Turn boto errors escaping ``func`` into ``StorageError``"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except (BotoCoreError, ClientError) as e:
+            logger.exception(f"S3 request for a video upload failed: {func.__name__}")
+            raise StorageError(_('The video storage is not available right now, please try again')) from e
+    return wrapper
+
+
+def _is_gone(error):
+    """Whether S3 no longer knows the multipart upload, e.g. a lifecycle rule aborted it"""
+    return error.response.get('Error', {}).get('Code') == 'NoSuchUpload'
+
+
+def _mark_aborted(upload):
+    upload.status = 'aborted'
+    upload.save(update_fields=['status'])
+
+
+def can_upload_video(user, course):
+    return user.is_staff or course.instructor.user_id == user.id
+
+
+def target_field(upload):
+    """Model, object id and file field an upload fills"""
+    if upload.lesson_id:
+        return Lesson, upload.lesson_id, 'video_file'
+    return Course, upload.course_id, 'video_preview'
+
+
+def _client():
+    return media_storage.connection.meta.client
+
+
+def _key(name):
+    return media_storage._normalize_name(clean_name(name))
+
+
+def part_size_for(size):
+    """Configured part size, grown where needed to stay within S3's part count"""
+    return max(settings.VIDEO_UPLOAD_PART_SIZE, MIN_PART_SIZE, -(-size // MAX_PARTS))
+
+
+@_storage_errors
+def start_upload(user, course, lesson, filename, content_type, size):
+    """
+    Return the user's unfinished upload of the same file to the same
+    field, so it can be resumed, or start a new S3 multipart upload,
+    together with the parts S3 already has as ``uploaded_parts`` does.
+
+    An unfinished upload S3 has since dropped is marked aborted and a new
+    one started in its place.
+    """
+    if not 0 < size <= settings.VIDEO_UPLOAD_MAX_SIZE:
+        raise UploadError(_('Video files must be smaller than %(size)s bytes') % {'size': settings.VIDEO_UPLOAD_MAX_SIZE})
+    if not content_type.startswith('video/'):
+        raise UploadError(_('Only video files can be uploaded'))
+
+    existing = VideoUpload.objects.filter(
+        uploader=user, course=course, lesson=lesson, filename=filename, size=size, status='uploading'
+    ).order_by('-created_at').first()
+    if existing:
+        try:
+            return existing, _list_parts(existing)
+        except ClientError as e:
+            if not _is_gone(e):
+                raise
+            _mark_aborted(existing)
+
+    instance = lesson or course
+    field = instance._meta.get_field('video_file' if lesson else 'video_preview')
+    # A random suffix keeps names unique without asking S3 which are taken
+    root, ext = os.path.splitext(field.generate_filename(instance, filename))
+    name = f'{root}-{uuid.uuid4().hex[:12]}{ext}'
+
+    response = _client().create_multipart_upload(
+        Bucket=media_storage.bucket_name,
+        Key=_key(name),
+        ContentType=content_type,
+        **media_storage.get_object_parameters(name),
+    )
+    upload = VideoUpload.objects.create(
+        uploader=user,
+        course=course,
+        lesson=lesson,
+        filename=filename,
+        content_type=content_type,
+        size=size,
+        part_size=part_size_for(size),
+        name=name,
+        upload_id=response['UploadId'],
+    )
+    return upload, {}
+
+
+def _list_parts(upload):
+    parts = {}
+    params = {'Bucket': media_storage.bucket_name, 'Key': _key(upload.name), 'UploadId': upload.upload_id}
+    while True:
+        response = _client().list_parts(**params)
+        for part in response.get('Parts', []):
+            parts[part['PartNumber']] = (part['Size'], part['ETag'])
+        if not response.get('IsTruncated'):
+            return parts
+        params['PartNumberMarker'] = response['NextPartNumberMarker']
+
+
+@_storage_errors
+def uploaded_parts(upload):
+    """Parts S3 has received so far, as ``{part number: (size, etag)}``"""
+    return _list_parts(upload)
+
+
+@_storage_errors
+def presign_parts(upload, part_numbers):
+    """Presigned PUT URLs for the given part numbers of an upload"""
+    if upload.status != 'uploading':
+        raise UploadError(_('This upload is no longer active'))
+    part_numbers = sorted(set(part_numbers))[:MAX_PRESIGNED_PARTS]
+    if any(not 1 <= number <= upload.part_count for number in part_numbers):
+        raise UploadError(_('Invalid part number'))
+
+    client = _client()
+    key = _key(upload.name)
+    return {
+        number: client.generate_presigned_url(
+            'upload_part',
+            Params={
+                'Bucket': media_storage.bucket_name,
+                'Key': key,
+                'UploadId': upload.upload_id,
+                'PartNumber': number,
+            },
+            ExpiresIn=settings.VIDEO_UPLOAD_URL_EXPIRY,
+            HttpMethod='PUT',
+        )
+        for number in part_numbers
+    }
+
+
+@_storage_errors
+def complete_upload(upload):
+    """
+    Assemble the uploaded parts and point the target file field at the
+    video.
+
+    The part list comes from S3 rather than the browser, so an upload is
+    only completed once every part has arrived with the expected total
+    size. Completing an already completed upload is a no-op; one S3 has
+    dropped in the meantime is marked aborted.
+    """
+    with transaction.atomic():
+        upload = VideoUpload.objects.select_for_update().get(pk=upload.pk)
+        if upload.status == 'completed':
+            return upload
+        if upload.status != 'uploading':
+            raise UploadError(_('This upload is no longer active'))
+
+        try:
+            parts = _list_parts(upload)
+            if sorted(parts) != list(range(1, upload.part_count + 1)) or sum(size for size, _etag in parts.values()) != upload.size:
+                raise UploadError(_('Some parts of the video have not been uploaded yet'))
+
+            _client().complete_multipart_upload(
+                Bucket=media_storage.bucket_name,
+                Key=_key(upload.name),
+                UploadId=upload.upload_id,
+                MultipartUpload={
+                    'Parts': [{'PartNumber': number, 'ETag': etag} for number, (_size, etag) in sorted(parts.items())],
+                },
+            )
+        except ClientError as e:
+            if not _is_gone(e):
+                raise
+        else:
+            model, object_id, field_name = target_field(upload)
+            target = model.objects.select_for_update().get(pk=object_id)
+            setattr(target, field_name, upload.name)
+            target.save(update_fields=[field_name])
+
+            upload.status = 'completed'
+            upload.completed_at = timezone.now()
+            upload.save(update_fields=['status', 'completed_at'])
+            return upload
+
+    _mark_aborted(upload)
+    raise UploadError(_('This upload has expired, select the video again to start over'))
+
+
+@_storage_errors
+def abort_upload(upload):
+    """Discard an unfinished upload and the parts S3 holds for it"""
+    if upload.status != 'uploading':
+        return upload
+    try:
+        _client().abort_multipart_upload(
+            Bucket=media_storage.bucket_name,
+            Key=_key(upload.name),
+            UploadId=upload.upload_id,
+        )
+    except ClientError as e:
+        if not _is_gone(e):
+            raise
+    _mark_aborted(upload)
+    return upload
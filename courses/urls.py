@@ -12,6 +12,14 @@ urlpatterns = [
     path('my-courses/<slug:course_slug>/', views.my_lessons, name='my_lessons'),
     path('comment/<int:lesson_id>/', views.add_comment, name='add_comment'),
     path('reply/<int:comment_id>/', views.add_reply, name='add_reply'),
+    path('comment/<int:comment_id>/replies/', views.comment_replies, name='comment_replies'),
     path('update-lesson-progress/<int:lesson_id>/', views.update_lesson_progress, name='update_lesson_progress'),
+    path('lesson-progress/batch/', views.lesson_progress_batch, name='lesson_progress_batch'),
     path('instructor/<str:instructor_username>/', views.instructor_detail, name='instructor_detail'),
+    path('upload-video/<slug:course_slug>/', views.video_upload, name='video_upload'),
+    path('upload-video/<slug:course_slug>/<int:lesson_id>/', views.video_upload, name='lesson_video_upload'),
+    path('video-uploads/', views.start_video_upload, name='start_video_upload'),
+    path('video-uploads/<int:upload_id>/parts/', views.presign_video_parts, name='presign_video_parts'),
+    path('video-uploads/<int:upload_id>/complete/', views.complete_video_upload, name='complete_video_upload'),
+    path('video-uploads/<int:upload_id>/abort/', views.abort_video_upload, name='abort_video_upload'),
 ]
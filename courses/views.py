@@ -1,32 +1,70 @@
+import hashlib
+import json
+from django.core.cache import cache
 from django.shortcuts import render, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.utils.translation import gettext_lazy as _
 from django.core.paginator import Paginator
-from .models import Course, Lesson, Enrollment, Review, Comment, LessonProgress, Instructor
+from django.db.models import Exists, F, FilteredRelation, OuterRef, Q
+from .models import Course, Lesson, Enrollment, Review, Comment, LessonProgress, Instructor, VideoUpload
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, Http404
 from django.views.decorators.http import require_POST
-from django.db.models import Avg
-from django.db.models import Q
+from .access import get_enrollment, has_course_access
+from .comments import REPLIES_PER_THREAD, load_comment_threads, thread_replies
 from .forms import ReviewForm, CommentForm, CourseSearchForm
+from .navigation import get_lesson_index
+from .progress import record_heartbeats
+from .uploads import (
+    StorageError, UploadError, abort_upload, can_upload_video, complete_upload, presign_parts, start_upload,
+)
+from .search import search_courses
 from django.shortcuts import redirect
 from django.conf import settings
+from core.pagination import KeysetPaginator
+
+COURSES_PER_PAGE = 12
+LESSONS_PER_PAGE = 12
+MAX_HEARTBEATS_PER_REQUEST = 100
+
+# Seek orderings for the catalog, each ending with a unique tiebreaker
+COURSE_SORT_ORDERINGS = {
+    'created_at': ('-created_at', '-id'),
+    'price_low': ('price', 'id'),
+    'price_high': ('-price', '-id'),
+    'rating': ('-rating', '-id'),
+    'students': ('-enrolled_students', '-id'),
+}
+
+
+def catalog_total(courses, filters):
+    """
+    Number of courses matching a filter set, counted once per
+    ``COURSE_COUNT_CACHE_TIMEOUT`` so paging doesn't recount the catalog
+    """
+    digest = hashlib.md5(repr(sorted(filters.items())).encode()).hexdigest()
+    key = f'courses:catalog_total:{digest}'
+    total = cache.get(key)
+    if total is None:
+        total = courses.count()
+        cache.set(key, total, settings.COURSE_COUNT_CACHE_TIMEOUT)
+    return total
 
 
 def course_list(request):
     courses = Course.objects.filter(status='published')
     search_form = CourseSearchForm(request.GET)
+    query = ''
+    filters = {}
     if search_form.is_valid():
+        filters = search_form.cleaned_data
         query = search_form.cleaned_data['query']
         difficulty = search_form.cleaned_data['difficulty']
         min_price = search_form.cleaned_data['min_price']
         max_price = search_form.cleaned_data['max_price']
         
-        courses = courses.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(instructor__user__username__icontains=query)
-        )
+        if query:
+            courses = search_courses(courses, query)
         
         if difficulty:
             courses = courses.filter(difficulty=difficulty)
@@ -37,27 +75,37 @@ def course_list(request):
         if max_price:
             courses = courses.filter(price__lte=max_price)
             
-    sort_by = request.GET.get('sort', 'created_at')
-    if sort_by == 'price_low':
-        courses = courses.order_by('price')
-    elif sort_by == 'price_high':
-        courses = courses.order_by('-price')
-    elif sort_by == 'rating':
-        courses = courses.order_by('-rating')
-    elif sort_by == 'students':
-        courses = courses.order_by('-enrolled_students')
+    sort_by = request.GET.get('sort') or ('relevance' if query else 'created_at')
+    courses = courses.select_related('instructor__user')
+    total_courses = catalog_total(courses, filters)
+    
+    # Keep the current filters in pagination links
+    params = request.GET.copy()
+    for key in ('page', 'after', 'before'):
+        params.pop(key, None)
+    
+    if sort_by == 'relevance' and query:
+        # Relevance is computed per query, so it can't be used as a seek key
+        paginator = Paginator(courses.order_by('-search_rank', '-created_at', '-id'), COURSES_PER_PAGE)
+        page_obj = paginator.get_page(request.GET.get('page'))
+        is_keyset = False
     else:
-        courses = courses.order_by('-created_at')
-    
-    paginator = Paginator(courses, 12)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        ordering = COURSE_SORT_ORDERINGS.get(sort_by, COURSE_SORT_ORDERINGS['created_at'])
+        paginator = KeysetPaginator(courses, ordering, COURSES_PER_PAGE)
+        page_obj = paginator.get_page(
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+        )
+        is_keyset = True
     
     context = {
-        'courses': courses,
+        'courses': page_obj,
+        'total_courses': total_courses,
         'search_form': search_form,
         'sort_by': sort_by,
         'page_obj': page_obj,
+        'is_keyset': is_keyset,
+        'query_params': params.urlencode(),
     }
     return render(
         request,
@@ -71,23 +119,8 @@ def course_detail(request, slug):
     lessons = course.lessons.all()
     reviews = course.reviews.select_related('student').order_by('-created_at')[:10]
     
-    # Check if the user owns the course
-    user_owns_course = False
-    if request.user.is_authenticated:
-        # Check if the user has an enrollment for the course
-        user_owns_course = Enrollment.objects.filter(
-            student=request.user,
-            course=course
-        ).exists()
-        
-        # If no enrollment is found, check for a completed order (fallback)
-        if not user_owns_course:
-            from payments.models import Order
-            user_owns_course = Order.objects.filter(
-                user=request.user,
-                course=course,
-                status='completed'
-            ).exists()
+    # Check if the user owns the course (enrollment or completed order)
+    user_owns_course = has_course_access(request, course)
     
     context = {
         'course': course,
@@ -106,44 +139,28 @@ def lesson_detail(request, course_slug, lesson_id):
     course = get_object_or_404(Course, slug=course_slug, status='published')
     lesson = get_object_or_404(Lesson, id=lesson_id, course=course)
     
-    # Get previous and next lessons
-    lessons = list(course.lessons.order_by('order', 'id'))  # تأكد من الترتيب
-    current_index = next((i for i, l in enumerate(lessons) if l.id == lesson.id), None)
-    previous_lesson = lessons[current_index - 1] if current_index is not None and current_index > 0 else None
-    next_lesson = lessons[current_index + 1] if current_index is not None and current_index < len(lessons) - 1 else None
+    # Get previous and next lessons from the cached course index
+    lesson_index = get_lesson_index(course.id)
+    previous_lesson = lesson_index.previous(lesson.id)
+    next_lesson = lesson_index.next(lesson.id)
     
-    is_enrolled = False
-    enrollment = None
     course_progress = 0
     completed_lessons = 0
-    total_lessons = len(lessons)
+    total_lessons = len(lesson_index)
     
     reviews = course.reviews.select_related('student').order_by('-created_at')[:10]
     
     comment_form = CommentForm()
-    # Load comments with their replies using prefetch_related
-    comments = lesson.comments.filter(parent__isnull=True, is_active=True).prefetch_related(
-        'children__user'
-    ).select_related('user').order_by('created_at')
-    
-    if request.user.is_authenticated:
-        is_enrolled = Enrollment.objects.filter(student=request.user, course=course).exists()
-        
-        if is_enrolled:
-            try:
-                enrollment = Enrollment.objects.get(student=request.user, course=course)
-                
-                # Calculate course progress
-                lesson_progresses = LessonProgress.objects.filter(
-                    enrollment=enrollment,
-                    lesson__in=lessons
-                )
-                completed_lessons = lesson_progresses.filter(is_completed=True).count()
-                if total_lessons > 0:
-                    course_progress = (completed_lessons / total_lessons) * 100
-                    
-            except Enrollment.DoesNotExist:
-                enrollment = None
+    # One page of threads with a bounded number of replies each
+    comments = load_comment_threads(lesson, request.GET.get('comments_page'))
+    
+    enrollment = get_enrollment(request, course)
+    is_enrolled = enrollment is not None
+    if is_enrolled:
+        # Course progress from the enrollment's maintained counters
+        completed_lessons = enrollment.completed_lessons
+        total_lessons = enrollment.total_lessons
+        course_progress = enrollment.progress
 
     if not lesson.is_free and not is_enrolled:
         messages.error(request, _('You must enroll in the course to access this lesson.'))
@@ -182,10 +199,7 @@ def lesson_detail(request, course_slug, lesson_id):
 def add_review(request, course_slug):
     course = get_object_or_404(Course, slug=course_slug)
     
-    is_enrolled = False
-    if request.user.is_authenticated:
-        is_enrolled = Enrollment.objects.filter(student=request.user, course=course).exists()
-    if not is_enrolled:
+    if not has_course_access(request, course):
         messages.error(request, _('You must enroll in the course to add a review.'))
         return redirect('courses:course_detail', slug=course.slug)
     
@@ -198,14 +212,9 @@ def add_review(request, course_slug):
         review = form.save(commit=False)
         review.course = course
         review.student = request.user
+        # Course and instructor ratings are updated by the Review signals
         review.save()
         
-        # Update course rating and total reviews
-        avg_rating = course.reviews.aggregate(Avg('rating'))['rating__avg']
-        course.rating = round(avg_rating, 2) if avg_rating else 0
-        course.total_reviews = course.reviews.count()
-        course.save()
-        
         messages.success(request, _('Review added successfully!'))
     else:
         messages.error(request, _('Please correct the errors in your review.'))
@@ -232,36 +241,29 @@ def my_courses(request):
 
 @login_required
 def my_lessons(request, course_slug):
-    course = get_object_or_404(Course, slug=course_slug)
+    course = get_object_or_404(Course.objects.select_related('instructor__user'), slug=course_slug)
     # Check if the user is enrolled in the course
-    is_enrolled = Enrollment.objects.filter(student=request.user, course=course).exists()
-    if not is_enrolled:
+    enrollment = get_enrollment(request, course)
+    if enrollment is None:
         messages.error(request, _('You must enroll in this course to access its lessons.'))
         return redirect('courses:course_detail', slug=course.slug)
     
-    lessons = course.lessons.all().order_by('order')
-    # Get the user's enrollments
-    enrollment = Enrollment.objects.get(student=request.user, course=course)
-    
-    # Get the user's lesson progress
-    lesson_progress_map = {
-        lp.lesson_id: lp for lp in LessonProgress.objects.filter(enrollment=enrollment, lesson__in=lessons)
-    }
-    
-    completed_lessons = []
-    next_lesson = None
+    # Lessons LEFT JOIN this enrollment's progress, fetched once and reused
+    # for the next lesson, the completed list and the page
+    lessons = list(
+        course.lessons.annotate(
+            own_progress=FilteredRelation('lessonprogress', condition=Q(lessonprogress__enrollment=enrollment)),
+            progress_id=F('own_progress__id'),
+            progress_completed=F('own_progress__is_completed'),
+            watched_duration=F('own_progress__watched_duration'),
+            duration_seconds=F('duration_minutes') * 60,
+        ).only('id', 'course', 'title', 'description', 'duration_minutes', 'is_free').order_by('order', 'id')
+    )
     
-    for lesson in lessons:
-        lesson_progress = lesson_progress_map.get(lesson.id)
-        lesson.lesson_progress = lesson_progress
-        
-        # Check if lesson is completed
-        if lesson_progress and lesson_progress.is_completed:
-            completed_lessons.append(lesson)
-        elif not next_lesson and (not lesson_progress or not lesson_progress.is_completed):
-            next_lesson = lesson
+    completed_lessons = [lesson for lesson in lessons if lesson.progress_completed]
+    next_lesson = next((lesson for lesson in lessons if not lesson.progress_completed), None)
     
-    paginator = Paginator(lessons, 12)
+    paginator = Paginator(lessons, LESSONS_PER_PAGE)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
@@ -279,12 +281,12 @@ def my_lessons(request, course_slug):
 @login_required
 @require_POST
 def add_comment(request, lesson_id):
-    lesson = get_object_or_404(Lesson, id=lesson_id)
+    lesson = get_object_or_404(Lesson.objects.select_related('course'), id=lesson_id)
     comment = Comment()
     
     # Check if the user is enrolled in the course or if the lesson is free
     if not lesson.is_free:
-        if not Enrollment.objects.filter(student=request.user, course=lesson.course).exists():
+        if not has_course_access(request, lesson.course):
             messages.error(request, _('You must be enrolled to comment on this lesson.'))
             return redirect('courses:lesson_detail', 
                           course_slug=lesson.course.slug, lesson_id=lesson.id)
@@ -313,11 +315,12 @@ def add_comment(request, lesson_id):
 @require_POST
 def add_reply(request, comment_id):
     """Add a reply to a comment"""
-    parent_comment = get_object_or_404(Comment, id=comment_id)
+    parent_comment = get_object_or_404(Comment.objects.select_related('lesson__course'), id=comment_id)
     lesson = parent_comment.lesson
     
     # Check if user is enrolled in the course
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=lesson.course)
+    if not has_course_access(request, lesson.course):
+        raise Http404
     
     form = CommentForm(request.POST)
     if form.is_valid():
@@ -334,68 +337,199 @@ def add_reply(request, comment_id):
                    course_slug=lesson.course.slug, lesson_id=lesson.id)
 
 
+def comment_replies(request, comment_id):
+    """Next batch of replies for a thread, rendered for the lesson page"""
+    thread = get_object_or_404(
+        Comment.objects.select_related('lesson__course'), id=comment_id, parent__isnull=True, is_active=True
+    )
+    lesson = thread.lesson
+    if not lesson.is_free and not has_course_access(request, lesson.course):
+        raise Http404
+    
+    try:
+        offset = max(0, int(request.GET.get('offset', 0)))
+    except ValueError:
+        offset = 0
+    
+    # One extra row tells whether another batch follows
+    replies = list(thread_replies([thread.id], offset, REPLIES_PER_THREAD + 1))
+    has_more = len(replies) > REPLIES_PER_THREAD
+    replies = replies[:REPLIES_PER_THREAD]
+    
+    return render(request, 'courses/partials/comment_replies.html', {
+        'replies': replies,
+        'thread_id': thread.id,
+        'next_offset': offset + len(replies),
+        'has_more': has_more,
+    })
+
+
 @login_required
 @require_POST
 def update_lesson_progress(request, lesson_id):
-    """Update lesson progress via AJAX"""
-    lesson = get_object_or_404(Lesson, id=lesson_id)
-    enrollment = get_object_or_404(Enrollment, student=request.user, course=lesson.course)
-    
-    lesson_progress, created = LessonProgress.objects.get_or_create(
-        enrollment=enrollment,
-        lesson=lesson
-    )
-    
-    watched_duration = int(request.POST.get('watched_duration', 0))
-    lesson_progress.watched_duration = watched_duration
-    
-    # If watched 90% of the lesson, consider it completed
-    if watched_duration >= (lesson.duration_minutes * 60 * 0.9):
-        lesson_progress.is_completed = True
-        if not lesson_progress.completed_at:
-            from django.utils import timezone
-            lesson_progress.completed_at = timezone.now()
-    
-    lesson_progress.save()
-    
-    # Update course progress
-    total_lessons = enrollment.course.lessons.count()
-    completed_lessons = LessonProgress.objects.filter(
-        enrollment=enrollment,
-        is_completed=True
-    ).count()
-    
-    enrollment.progress = int((completed_lessons / total_lessons) * 100)
-    if enrollment.progress == 100 and not enrollment.is_completed:
-        enrollment.is_completed = True
-        from django.utils import timezone
-        enrollment.completed_at = timezone.now()
-    
-    enrollment.save()
-    
+    """Update lesson progress via AJAX (single heartbeat)"""
+    try:
+        watched_duration = max(0, int(request.POST.get('watched_duration', 0)))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Invalid watched duration'}, status=400)
+    
+    accepted, _result = record_heartbeats(request.user, [(lesson_id, watched_duration)])
+    if lesson_id not in accepted:
+        raise Http404
+    
+    # A completing heartbeat is flushed right away, so the stored state is current
+    progress, lesson_completed = Enrollment.objects.filter(
+        student=request.user, course__lessons__id=lesson_id
+    ).annotate(
+        lesson_completed=Exists(LessonProgress.objects.filter(
+            enrollment=OuterRef('pk'), lesson_id=lesson_id, is_completed=True
+        ))
+    ).values_list('progress', 'lesson_completed').get()
+    return JsonResponse({
+        'success': True,
+        'progress': progress,
+        'lesson_completed': lesson_completed,
+    })
+
+
+@login_required
+@require_POST
+def lesson_progress_batch(request):
+    """
+    Accept many video heartbeats in one request:
+    {"heartbeats": [{"lesson_id": 1, "watched_duration": 120}, ...]}
+    """
+    try:
+        data = json.loads(request.body)
+        items = [
+            (int(item['lesson_id']), max(0, int(item['watched_duration'])))
+            for item in data['heartbeats'][:MAX_HEARTBEATS_PER_REQUEST]
+        ]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'success': False, 'error': 'Invalid heartbeat payload'}, status=400)
+    
+    accepted, result = record_heartbeats(request.user, items)
     return JsonResponse({
         'success': True,
-        'progress': enrollment.progress,
-        'lesson_completed': lesson_progress.is_completed
+        'accepted': sorted(accepted),
+        'completed_lessons': sorted(key[1] for key in result.completed),
+        'progress': {str(enrollment_id): progress for enrollment_id, progress in result.progress.items()},
     })
 
 def instructor_detail(request, instructor_username):
-    instructor = get_object_or_404(Instructor, user__username=instructor_username)
+    instructor = get_object_or_404(Instructor.objects.select_related('user'), user__username=instructor_username)
+    # Course and student totals are kept up to date by the courses signals
     courses = Course.objects.filter(
         instructor=instructor,
         status='published'
     ).order_by('-created_at')
     
-    # update total courses
-    total_courses = courses.values('instructor').count()
-    
-    # save total courses    
-    instructor.total_courses = total_courses
-    instructor.save()
-    
     context = {
         'instructor': instructor,
         'courses': courses,
     }
     
     return render(request, 'courses/instructor_detail.html', context)
+
+
+@login_required
+def video_upload(request, course_slug, lesson_id=None):
+    """Page uploading a lesson video, or the course preview, straight to S3"""
+    course = get_object_or_404(Course.objects.select_related('instructor'), slug=course_slug)
+    if not can_upload_video(request.user, course):
+        raise Http404
+    lesson = get_object_or_404(Lesson, id=lesson_id, course=course) if lesson_id else None
+    
+    context = {
+        'course': course,
+        'lesson': lesson,
+    }
+    return render(request, 'courses/video_upload.html', context)
+
+
+def _upload_payload(upload, parts):
+    return {
+        'success': True,
+        'upload_id': upload.id,
+        'status': upload.status,
+        'part_size': upload.part_size,
+        'part_count': upload.part_count,
+        'uploaded_parts': sorted(parts),
+    }
+
+
+def _get_own_upload(request, upload_id):
+    return get_object_or_404(VideoUpload, id=upload_id, uploader=request.user)
+
+
+@login_required
+@require_POST
+def start_video_upload(request):
+    """
+    Start, or resume, a multipart upload:
+    {"course_id": 1, "lesson_id": 2, "filename": "intro.mp4", "content_type": "video/mp4", "size": 123}
+    """
+    try:
+        data = json.loads(request.body)
+        course_id = int(data['course_id'])
+        lesson_id = int(data['lesson_id']) if data.get('lesson_id') else None
+        filename = str(data['filename'])[:255]
+        content_type = str(data['content_type'])
+        size = int(data['size'])
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'success': False, 'error': 'Invalid upload payload'}, status=400)
+    
+    course = get_object_or_404(Course.objects.select_related('instructor'), id=course_id)
+    if not can_upload_video(request.user, course):
+        return JsonResponse({'success': False, 'error': str(_('You cannot upload videos to this course'))}, status=403)
+    lesson = get_object_or_404(Lesson, id=lesson_id, course=course) if lesson_id else None
+    
+    try:
+        upload, parts = start_upload(request.user, course, lesson, filename, content_type, size)
+    except StorageError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=502)
+    except UploadError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse(_upload_payload(upload, parts))
+
+
+@login_required
+@require_POST
+def presign_video_parts(request, upload_id):
+    """Presigned URLs for the browser to PUT parts to: {"part_numbers": [1, 2, ...]}"""
+    upload = _get_own_upload(request, upload_id)
+    try:
+        part_numbers = [int(number) for number in json.loads(request.body)['part_numbers']]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'success': False, 'error': 'Invalid parts payload'}, status=400)
+    
+    try:
+        urls = presign_parts(upload, part_numbers)
+    except StorageError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=502)
+    except UploadError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, 'urls': {str(number): url for number, url in urls.items()}})
+
+
+@login_required
+@require_POST
+def complete_video_upload(request, upload_id):
+    upload = _get_own_upload(request, upload_id)
+    try:
+        upload = complete_upload(upload)
+    except StorageError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=502)
+    except UploadError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=409)
+    return JsonResponse({'success': True, 'status': upload.status, 'name': upload.name})
+
+
+@login_required
+@require_POST
+def abort_video_upload(request, upload_id):
+    try:
+        upload = abort_upload(_get_own_upload(request, upload_id))
+    except StorageError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=502)
+    return JsonResponse({'success': True, 'status': upload.status})
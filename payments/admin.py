@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Order, Payment, Coupon
+from .models import Order, Payment, Coupon, WebhookEvent
 
 admin.site.register(Order)
 admin.site.register(Payment)
 admin.site.register(Coupon)
+admin.site.register(WebhookEvent)
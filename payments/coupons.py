@@ -0,0 +1,117 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from .models import Coupon
+
+# Sentinel telling "not cached" apart from a cached miss (unknown code)
+_MISSING = object()
+
+
+class CouponError(Exception):
+    """A coupon code that can't be applied, with a message for the user"""
+
+
+def normalize_code(code):
+    return (code or '').strip().upper()
+
+
+def coupon_cache_key(code):
+    return f'payments:coupon:{normalize_code(code)}'
+
+
+def invalidate_coupon(code):
+    cache.delete(coupon_cache_key(code))
+
+
+def get_active_coupon(code):
+    """
+    Return the active coupon with this code (case-insensitive) or None.
+
+    Lookups, including misses, are cached for ``COUPON_CACHE_TIMEOUT``
+    seconds so a flood of redemptions of one code reads it once. Usage
+    counts are not taken from the cache; ``reserve_coupon`` checks them.
+    """
+    key = coupon_cache_key(code)
+    coupon = cache.get(key, _MISSING)
+    if coupon is _MISSING:
+        coupon = Coupon.objects.filter(code__iexact=normalize_code(code), is_active=True).first()
+        cache.set(key, coupon, settings.COUPON_CACHE_TIMEOUT)
+    return coupon
+
+
+def coupon_discount(coupon, amount):
+    """Discount ``coupon`` gives on ``amount``, never more than the amount itself"""
+    if coupon.discount_type == 'percentage':
+        discount = amount * coupon.discount_value / 100
+    else:
+        discount = coupon.discount_value
+    return min(amount, discount).quantize(Decimal('0.01'))
+
+
+def reserve_coupon(coupon_id):
+    """
+    Count one use of a coupon if it is still redeemable.
+
+    The validity window, active flag and usage limit are checked by the
+    same conditional UPDATE that increments ``used_count``, so concurrent
+    redemptions can never exceed the limit. Returns whether a use was
+    reserved.
+    """
+    now = timezone.now()
+    return bool(
+        Coupon.objects.filter(
+            Q(usage_limit__isnull=True) | Q(used_count__lt=F('usage_limit')),
+            pk=coupon_id,
+            is_active=True,
+            valid_from__lte=now,
+            valid_to__gte=now,
+        ).update(used_count=F('used_count') + 1)
+    )
+
+
+def release_coupon(coupon_id):
+    """Give back a use reserved by ``reserve_coupon``"""
+    Coupon.objects.filter(pk=coupon_id, used_count__gt=0).update(used_count=F('used_count') - 1)
+
+
+def price_order(order, course, code=''):
+    """
+    Price a pending order at the course's final price, less the coupon
+    ``code`` if one is given, and save it.
+
+    A coupon is reserved once per order: pricing the same order again with
+    the same code doesn't count another use, and switching or dropping the
+    code releases the previous one. Raises ``CouponError`` when the code
+    can't be applied.
+    """
+    amount = course.final_price
+    coupon = None
+    if normalize_code(code):
+        coupon = get_active_coupon(code)
+        if coupon is None:
+            raise CouponError(_('Invalid coupon code'))
+        now = timezone.now()
+        if not coupon.valid_from <= now <= coupon.valid_to:
+            raise CouponError(_('This coupon has expired'))
+        if amount < coupon.minimum_amount:
+            raise CouponError(_('This coupon requires a minimum amount of %(amount)s') % {'amount': coupon.minimum_amount})
+
+    coupon_id = coupon.id if coupon else None
+    with transaction.atomic():
+        if coupon_id != order.coupon_id:
+            if coupon_id and not reserve_coupon(coupon_id):
+                raise CouponError(_('This coupon has reached its usage limit'))
+            if order.coupon_id:
+                release_coupon(order.coupon_id)
+
+        order.coupon_id = coupon_id
+        order.discount_amount = coupon_discount(coupon, amount) if coupon else Decimal('0.00')
+        order.amount = amount - order.discount_amount
+        order.save(update_fields=['coupon', 'discount_amount', 'amount', 'updated_at'])
+    return order
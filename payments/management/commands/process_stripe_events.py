@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from payments.webhooks import process_pending_events
+
+
+class Command(BaseCommand):
+    help = 'Process pending Stripe webhook events from the inbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Events to process per batch')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new events')
+        parser.add_argument('--interval', type=float, default=2, help='Seconds to wait when the inbox is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            processed, failed = process_pending_events(options['batch_size'])
+            if processed or failed:
+                self.stdout.write(f'Processed {processed} events, {failed} failed.')
+            if not options['loop']:
+                break
+            if processed + failed < options['batch_size']:
+                time.sleep(options['interval'])
@@ -19,6 +19,10 @@ class Order(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     currency = models.CharField(max_length=3, default='USD')
     
+    # Coupon reserved for this order and the discount it gave
+    coupon = models.ForeignKey('Coupon', null=True, blank=True, on_delete=models.SET_NULL, related_name='orders')
+    discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    
     status = models.CharField(max_length=20, choices=ORDER_STATUS, default='pending')
     
     # Stripe information
@@ -79,4 +83,32 @@ class Coupon(models.Model):
     
     def __str__(self):
         return self.code
-    
\ No newline at end of file
+    
+
+class WebhookEvent(models.Model):
+    """Inbox of Stripe webhook events, one row per Stripe event id"""
+    STATUS = [
+        ('pending', _('Pending')),
+        ('processed', _('Processed')),
+        ('failed', _('Failed')),
+    ]
+    
+    event_id = models.CharField(max_length=255, unique=True)
+    event_type = models.CharField(max_length=100)
+    payload = models.JSONField()
+    
+    status = models.CharField(max_length=20, choices=STATUS, default='pending')
+    last_error = models.TextField(blank=True)
+    
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        verbose_name = _('Webhook Event')
+        verbose_name_plural = _('Webhook Events')
+        indexes = [
+            models.Index(fields=['status', 'received_at'], name='webhook_event_queue_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} {self.event_id} ({self.status})"
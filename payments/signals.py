@@ -0,0 +1,18 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from courses.access import invalidate_course_access
+from .coupons import invalidate_coupon
+from .models import Coupon, Order
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def clear_course_access(sender, instance, **kwargs):
+    """A completed (or refunded) order changes who owns the course"""
+    invalidate_course_access(instance.user_id, instance.course_id)
+
+
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def clear_coupon_cache(sender, instance, **kwargs):
+    invalidate_coupon(instance.code)
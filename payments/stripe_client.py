@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import weakref
+
+import stripe
+from django.conf import settings
+
+_sync_client = None
+_sync_client_lock = threading.Lock()
+
+# httpx async connections belong to the event loop that opened them
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def build_client(allow_sync_methods=False):
+    """
+    A ``StripeClient`` over an httpx keep-alive connection pool, with the
+    configured per-attempt timeout, retry budget and API base.
+    """
+    base_addresses = {'api': settings.STRIPE_API_BASE} if settings.STRIPE_API_BASE else {}
+    return stripe.StripeClient(
+        settings.STRIPE_SECRET_KEY,
+        http_client=stripe.HTTPXClient(
+            timeout=settings.STRIPE_TIMEOUT,
+            allow_sync_methods=allow_sync_methods,
+        ),
+        max_network_retries=settings.STRIPE_MAX_NETWORK_RETRIES,
+        base_addresses=base_addresses,
+    )
+
+
+def get_stripe_client():
+    """Process-wide client for synchronous views"""
+    global _sync_client
+    if _sync_client is None:
+        with _sync_client_lock:
+            if _sync_client is None:
+                _sync_client = build_client(allow_sync_methods=True)
+    return _sync_client
+
+
+def get_async_stripe_client():
+    """Client for the running event loop, for async views"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = build_client()
+    return client
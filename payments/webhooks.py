@@ -0,0 +1,153 @@
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from courses.models import Enrollment
+from .coupons import release_coupon
+from .models import Order, Payment, WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+
+def fulfill_order(order_id, payment_intent=''):
+    """
+    Complete a pending order: mark it completed, record the payment and
+    enroll the student.
+
+    The order row is locked for the duration, so concurrent webhook
+    deliveries and the success redirect fulfill an order at most once.
+    Returns the order, or None if it doesn't exist.
+    """
+    with transaction.atomic():
+        order = Order.objects.select_for_update().filter(order_id=order_id).first()
+        if order is None:
+            logger.warning(f"Order not found: {order_id}")
+            return None
+        if order.status != 'pending':
+            logger.info(f"Order already processed: {order_id} (status: {order.status})")
+            return order
+
+        order.status = 'completed'
+        order.completed_at = timezone.now()
+        order.save(update_fields=['status', 'completed_at', 'updated_at'])
+
+        Payment.objects.get_or_create(
+            order=order,
+            defaults={
+                'stripe_charge_id': payment_intent or '',
+                'amount': order.amount,
+                'currency': order.currency,
+                'status': 'succeeded',
+            }
+        )
+        Enrollment.objects.get_or_create(student_id=order.user_id, course_id=order.course_id)
+
+    logger.info(f"Order fulfilled: {order_id}")
+    return order
+
+
+def cancel_order(order_id, checkout_session_id):
+    """
+    Cancel a pending order whose checkout session ended unpaid and give
+    back its coupon. Orders since moved to a newer session are left alone.
+    """
+    with transaction.atomic():
+        order = Order.objects.select_for_update().filter(order_id=order_id).first()
+        if order is None or order.status != 'pending' or order.stripe_payment_intent_id != checkout_session_id:
+            return order
+
+        order.status = 'cancelled'
+        order.save(update_fields=['status', 'updated_at'])
+        if order.coupon_id:
+            release_coupon(order.coupon_id)
+
+    logger.info(f"Order cancelled: {order_id}")
+    return order
+
+
+def handle_checkout_session_completed(session):
+    """Processing completed checkout session"""
+    order_id = (session.get('metadata') or {}).get('order_id')
+    if not order_id:
+        logger.warning(f"No order_id in metadata of checkout session {session.get('id', 'unknown')}")
+        return
+    fulfill_order(order_id, session.get('payment_intent') or '')
+
+
+def handle_checkout_session_expired(session):
+    """Processing checkout session that expired before payment"""
+    order_id = (session.get('metadata') or {}).get('order_id')
+    if order_id:
+        cancel_order(order_id, session.get('id'))
+
+
+def handle_payment_intent_succeeded(payment_intent):
+    """Processing successful payment intent"""
+    # Add additional logic here
+    pass
+
+
+# Event types stored in the inbox; any other event is acknowledged and dropped
+EVENT_HANDLERS = {
+    'checkout.session.completed': handle_checkout_session_completed,
+    'checkout.session.expired': handle_checkout_session_expired,
+    'payment_intent.succeeded': handle_payment_intent_succeeded,
+}
+
+
+def record_event(event):
+    """
+    Store a verified Stripe event in the inbox.
+
+    One INSERT that ignores an existing event id, so redelivered events
+    cost the same as new ones and are never processed twice. Returns
+    False for event types nobody handles.
+    """
+    if event['type'] not in EVENT_HANDLERS:
+        return False
+    WebhookEvent.objects.bulk_create(
+        [WebhookEvent(event_id=event['id'], event_type=event['type'], payload=event)],
+        ignore_conflicts=True,
+    )
+    return True
+
+
+def process_pending_events(limit=100):
+    """
+    Run the handlers of up to ``limit`` pending inbox events, oldest first.
+
+    Each event is locked with ``select_for_update(skip_locked=True)`` and
+    marked processed in the same transaction as its handler's writes, so
+    concurrent workers never run the same event. A failing event is marked
+    failed and left for inspection rather than retried.
+
+    Returns ``(processed, failed)``.
+    """
+    event_ids = list(
+        WebhookEvent.objects.filter(status='pending').order_by('received_at', 'id').values_list('id', flat=True)[:limit]
+    )
+    processed = failed = 0
+    for event_id in event_ids:
+        try:
+            with transaction.atomic():
+                event = WebhookEvent.objects.select_for_update(skip_locked=True).filter(
+                    pk=event_id, status='pending'
+                ).first()
+                if event is None:
+                    # Claimed by another worker
+                    continue
+                EVENT_HANDLERS[event.event_type](event.payload['data']['object'])
+                event.status = 'processed'
+                event.processed_at = timezone.now()
+                event.save(update_fields=['status', 'processed_at'])
+            processed += 1
+        except Exception as e:
+            logger.exception(f"Webhook event {event_id} failed")
+            WebhookEvent.objects.filter(pk=event_id, status='pending').update(
+                status='failed',
+                last_error=str(e),
+                processed_at=timezone.now(),
+            )
+            failed += 1
+    return processed, failed
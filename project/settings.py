@@ -95,9 +95,9 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # WhiteNoise
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.SlidingSessionMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'core.middleware.PreferredLanguageMiddleware',
-    'django.middleware.locale.LocaleMiddleware',
+    'core.middleware.LanguageMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'allauth.account.middleware.AccountMiddleware',
@@ -224,17 +224,26 @@ AWS_ACCESS_KEY_ID = config('AWS_ACCESS_KEY_ID')
 AWS_SECRET_ACCESS_KEY = config('AWS_SECRET_ACCESS_KEY')
 AWS_STORAGE_BUCKET_NAME = config('AWS_STORAGE_BUCKET_NAME')
 AWS_S3_REGION_NAME = config('AWS_S3_REGION_NAME')
-AWS_S3_CUSTOM_DOMAIN = f'{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com'
+# Point the S3 storage at a local stand-in (e.g. MinIO) for testing
+AWS_S3_ENDPOINT_URL = config('AWS_S3_ENDPOINT_URL', default=None)
+AWS_S3_CUSTOM_DOMAIN = None if AWS_S3_ENDPOINT_URL else f'{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com'
 
 # S3 Storage Settings
 AWS_S3_OBJECT_PARAMETERS = {
     'CacheControl': 'max-age=86400',
 }
 AWS_LOCATION = 'media'
+# Media is public; unsigned URLs depend only on the file name, which lets
+# core.storage.MediaStorage memoize them (up to this many per process)
+AWS_QUERYSTRING_AUTH = config('AWS_QUERYSTRING_AUTH', default=False, cast=bool)
+MEDIA_URL_CACHE_SIZE = config('MEDIA_URL_CACHE_SIZE', default=4096, cast=int)
 
 # Media files configuration
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
-MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/{AWS_LOCATION}/'
+if AWS_S3_ENDPOINT_URL:
+    MEDIA_URL = f'{AWS_S3_ENDPOINT_URL.rstrip("/")}/{AWS_STORAGE_BUCKET_NAME}/{AWS_LOCATION}/'
+else:
+    MEDIA_URL = f'https://{AWS_S3_CUSTOM_DOMAIN}/{AWS_LOCATION}/'
 
 # Security Settings for Production
 if not DEBUG:
@@ -248,12 +257,85 @@ if not DEBUG:
     CSRF_COOKIE_SECURE = True
     SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 
+# Cache
+# Redis is shared by every worker in production, local memory is used otherwise
+REDIS_URL = config('REDIS_URL', default='')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'learning_academy',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Site settings cache (seconds): shared cache and per-process copy
+SITE_SETTINGS_CACHE_TIMEOUT = config('SITE_SETTINGS_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+SITE_SETTINGS_LOCAL_TTL = config('SITE_SETTINGS_LOCAL_TTL', default=30, cast=int)
+
+# Course ownership checks are cached per (user, course) for this many seconds
+COURSE_ACCESS_CACHE_TIMEOUT = config('COURSE_ACCESS_CACHE_TIMEOUT', default=60 * 5, cast=int)
+
+# Coupon lookups by code are cached for this many seconds; usage is always
+# counted in the database
+COUPON_CACHE_TIMEOUT = config('COUPON_CACHE_TIMEOUT', default=60 * 5, cast=int)
+
+# Catalog totals per filter set (seconds), so keyset pages don't recount
+COURSE_COUNT_CACHE_TIMEOUT = config('COURSE_COUNT_CACHE_TIMEOUT', default=60 * 5, cast=int)
+
+# Per-course lesson navigation index (seconds), dropped whenever a lesson changes
+LESSON_INDEX_CACHE_TIMEOUT = config('LESSON_INDEX_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
+# Home page fragment cache (seconds)
+HOME_CACHE_TIMEOUT = config('HOME_CACHE_TIMEOUT', default=60 * 15, cast=int)
+
+# Related articles per category (seconds); refreshed whenever an article
+# of the category is saved or deleted, expiry picks up scheduled posts
+RELATED_ARTICLES_CACHE_TIMEOUT = config('RELATED_ARTICLES_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+# Blog sidebar per language (seconds); refresh_blog_sidebar recomputes it
+# on a schedule and category, tag or article changes drop it
+BLOG_SIDEBAR_CACHE_TIMEOUT = config('BLOG_SIDEBAR_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+# Article view counter: buffered views are written every N seconds or
+# once this many articles are pending
+ARTICLE_VIEWS_FLUSH_INTERVAL = config('ARTICLE_VIEWS_FLUSH_INTERVAL', default=10, cast=int)
+ARTICLE_VIEWS_MAX_PENDING = config('ARTICLE_VIEWS_MAX_PENDING', default=100, cast=int)
+
+# Lesson progress heartbeats are coalesced and written every N seconds or
+# once this many (enrollment, lesson) pairs are pending
+LESSON_PROGRESS_FLUSH_INTERVAL = config('LESSON_PROGRESS_FLUSH_INTERVAL', default=15, cast=int)
+LESSON_PROGRESS_MAX_PENDING = config('LESSON_PROGRESS_MAX_PENDING', default=500, cast=int)
+
+# Direct-to-S3 multipart uploads of course videos: part size, lifetime of
+# the presigned part URLs (seconds) and largest accepted video (bytes)
+VIDEO_UPLOAD_PART_SIZE = config('VIDEO_UPLOAD_PART_SIZE', default=64 * 1024 * 1024, cast=int)
+VIDEO_UPLOAD_URL_EXPIRY = config('VIDEO_UPLOAD_URL_EXPIRY', default=60 * 60, cast=int)
+VIDEO_UPLOAD_MAX_SIZE = config('VIDEO_UPLOAD_MAX_SIZE', default=20 * 1024 ** 3, cast=int)
+
 # Session Configuration
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'  # Save sessions in database
+# Session store: 'cached_db' (read through the cache, written to the
+# database), 'db' or 'signed_cookies' (no server-side storage)
+SESSION_STORE = config('SESSION_STORE', default='cached_db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_STORE]
 SESSION_COOKIE_AGE = 86400 * 30  # 30 days
 SESSION_COOKIE_NAME = 'learning_academy_sessionid'
 SESSION_COOKIE_HTTPONLY = True
-SESSION_SAVE_EVERY_REQUEST = True  # Save session in every request
+# Sessions are only saved when they change; core.middleware.SlidingSessionMiddleware
+# rewrites an unchanged session once less than this many seconds of it remain
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_WINDOW = config('SESSION_REFRESH_WINDOW', default=86400 * 7, cast=int)
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False  # Do not expire session when browser is closed
 SESSION_COOKIE_SAMESITE = 'Lax'
 
@@ -272,12 +354,17 @@ CSRF_COOKIE_SAMESITE = 'Lax'
 
 AWS_S3_FILE_OVERWRITE = False
 AWS_S3_SIGNATURE_VERSION = 's3v4'
-AWS_QUERYSTRING_AUTH = False
 
 # Stripe
 STRIPE_PUBLIC_KEY = config('STRIPE_PUBLIC_KEY')
 STRIPE_SECRET_KEY = config('STRIPE_SECRET_KEY')
 STRIPE_WEBHOOK_SECRET = config('STRIPE_WEBHOOK_SECRET')
+# API calls go through a pooled keep-alive client; each attempt times out after
+# STRIPE_TIMEOUT seconds and failed attempts are retried at most N times.
+# STRIPE_API_BASE points the client at a local stand-in such as stripe-mock.
+STRIPE_API_BASE = config('STRIPE_API_BASE', default='')
+STRIPE_TIMEOUT = config('STRIPE_TIMEOUT', default=10, cast=float)
+STRIPE_MAX_NETWORK_RETRIES = config('STRIPE_MAX_NETWORK_RETRIES', default=2, cast=int)
 
 # Payment Settings - update for production
 PAYMENT_SUCCESS_URL = config('PAYMENT_SUCCESS_URL', default='http://localhost:8000/payments/success/')
@@ -17,4 +17,9 @@ python manage.py collectstatic --no-input
 echo "🗄️ Running migrations..."
 python manage.py migrate
 
+# Rebuild search indexes
+echo "🔎 Rebuilding search indexes..."
+python manage.py rebuild_course_search_index
+python manage.py rebuild_article_search_index
+
 echo "✅ Build completed successfully!"
@@ -0,0 +1,148 @@
+// Direct-to-S3 multipart video upload
+// Parts are PUT straight to the bucket with presigned URLs; the server
+// only starts, signs and completes the upload, and tells which parts S3
+// already has so an interrupted upload resumes where it stopped.
+document.addEventListener('DOMContentLoaded', function() {
+    const container = document.getElementById('video-upload');
+    if (!container) {
+        return;
+    }
+
+    const PARALLEL_PARTS = 4;
+    const PART_RETRIES = 3;
+    const SIGN_BATCH = 20;
+
+    const fileInput = document.getElementById('video-upload-file');
+    const startButton = document.getElementById('video-upload-start');
+    const abortButton = document.getElementById('video-upload-abort');
+    const progressBar = document.getElementById('video-upload-progress');
+    const statusText = document.getElementById('video-upload-status');
+    const csrfToken = container.querySelector('[name=csrfmiddlewaretoken]').value;
+
+    let uploadId = null;
+    let cancelled = false;
+
+    function uploadUrl(name) {
+        // Reversed with a placeholder id of 0
+        return container.dataset[name].replace('/0/', '/' + uploadId + '/');
+    }
+
+    function post(url, body) {
+        return fetch(url, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': csrfToken,
+            },
+            body: JSON.stringify(body || {}),
+        }).then(function(response) {
+            return response.json().then(function(data) {
+                if (!data.success) {
+                    throw new Error(data.error || response.statusText);
+                }
+                return data;
+            });
+        });
+    }
+
+    function showProgress(done, total) {
+        const percent = total ? Math.floor(done * 100 / total) : 100;
+        progressBar.style.width = percent + '%';
+        progressBar.textContent = percent + '%';
+    }
+
+    function putPart(url, blob, attempt) {
+        return fetch(url, {method: 'PUT', body: blob}).then(function(response) {
+            if (!response.ok) {
+                throw new Error('Part upload failed: ' + response.status);
+            }
+        }).catch(function(error) {
+            if (attempt >= PART_RETRIES || cancelled) {
+                throw error;
+            }
+            return putPart(url, blob, attempt + 1);
+        });
+    }
+
+    async function upload(file) {
+        const started = await post(container.dataset.startUrl, {
+            course_id: container.dataset.courseId,
+            lesson_id: container.dataset.lessonId || null,
+            filename: file.name,
+            content_type: file.type || 'video/mp4',
+            size: file.size,
+        });
+        uploadId = started.upload_id;
+        abortButton.classList.remove('d-none');
+
+        const uploaded = new Set(started.uploaded_parts);
+        const pending = [];
+        for (let number = 1; number <= started.part_count; number++) {
+            if (!uploaded.has(number)) {
+                pending.push(number);
+            }
+        }
+        let done = uploaded.size;
+        showProgress(done, started.part_count);
+        if (uploaded.size) {
+            statusText.textContent = 'Resuming upload: ' + uploaded.size + ' of ' + started.part_count + ' parts already uploaded.';
+        }
+
+        for (let i = 0; i < pending.length && !cancelled; i += SIGN_BATCH) {
+            const batch = pending.slice(i, i + SIGN_BATCH);
+            const signed = await post(uploadUrl('partsUrl'), {part_numbers: batch});
+            const queue = batch.slice();
+            const workers = [];
+            for (let w = 0; w < PARALLEL_PARTS; w++) {
+                workers.push((async function() {
+                    while (queue.length && !cancelled) {
+                        const number = queue.shift();
+                        const offset = (number - 1) * started.part_size;
+                        await putPart(signed.urls[number], file.slice(offset, offset + started.part_size), 1);
+                        done += 1;
+                        showProgress(done, started.part_count);
+                    }
+                })());
+            }
+            await Promise.all(workers);
+        }
+        if (cancelled) {
+            return;
+        }
+
+        statusText.textContent = 'Finishing upload...';
+        await post(uploadUrl('completeUrl'));
+        statusText.textContent = 'Upload complete.';
+        abortButton.classList.add('d-none');
+    }
+
+    startButton.addEventListener('click', function() {
+        const file = fileInput.files[0];
+        if (!file) {
+            return;
+        }
+        cancelled = false;
+        startButton.disabled = true;
+        fileInput.disabled = true;
+        upload(file).catch(function(error) {
+            statusText.textContent = error.message + ' Select the same file again to resume.';
+        }).finally(function() {
+            startButton.disabled = false;
+            fileInput.disabled = false;
+        });
+    });
+
+    abortButton.addEventListener('click', function() {
+        if (!uploadId) {
+            return;
+        }
+        cancelled = true;
+        post(uploadUrl('abortUrl')).then(function() {
+            statusText.textContent = 'Upload cancelled.';
+            showProgress(0, 1);
+            abortButton.classList.add('d-none');
+        }).catch(function(error) {
+            statusText.textContent = error.message;
+        });
+    });
+});